@@ -0,0 +1,115 @@
+"""Базовая схема: пользователи, клиенты, прогнозы, рекомендации, метрики
+
+Для БД, созданных до миграций (create_all при старте, init.sql, скрипты
+migrate_*.py), существующие таблицы не пересоздаются, а приводятся к
+базовой схеме: client_id -> id, incomevalue -> "incomeValue", pdn -> "PDN", недостающие
+колонки добавляются, неиспользуемые удаляются.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Базовые колонки clients (без решений по кредиту - они добавлены в 0002)
+CLIENT_COLUMNS = [
+    ("target", sa.Float()),
+    ("incomeValue", sa.Float()),
+    ("avg_cur_cr_turn", sa.Float()),
+    ("ovrd_sum", sa.Float()),
+    ("loan_cur_amt", sa.Float()),
+    ("hdb_income_ratio", sa.Float()),
+    ("PDN", sa.Float()),
+    ("created_at", sa.DateTime()),
+]
+
+LEGACY_CLIENT_COLUMNS = ("adminarea", "city_smart_name")
+
+def _create_tables(existing: set) -> None:
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("user_id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("password_hash", sa.String(500), nullable=False),
+            sa.Column("full_name", sa.String(255)),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("last_login", sa.DateTime()),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "clients" not in existing:
+        op.create_table(
+            "clients",
+            sa.Column("id", sa.String(50), primary_key=True),
+            *[sa.Column(name, type_) for name, type_ in CLIENT_COLUMNS],
+        )
+
+    if "predictions" not in existing:
+        op.create_table(
+            "predictions",
+            sa.Column("prediction_id", sa.String(50), primary_key=True),
+            sa.Column("client_id", sa.String(50), sa.ForeignKey("clients.id"), nullable=False),
+            sa.Column("predicted_income", sa.Float(), nullable=False),
+            sa.Column("confidence", sa.Float(), nullable=False),
+            sa.Column("category", sa.String(20), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+    if "recommendations" not in existing:
+        op.create_table(
+            "recommendations",
+            sa.Column("recommendation_id", sa.String(50), primary_key=True),
+            sa.Column("client_id", sa.String(50), sa.ForeignKey("clients.id"), nullable=False),
+            sa.Column("product_type", sa.String(100), nullable=False),
+            sa.Column("recommendation_text", sa.String(500), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+    if "model_metrics" not in existing:
+        op.create_table(
+            "model_metrics",
+            sa.Column("metric_id", sa.String(50), primary_key=True),
+            sa.Column("metric_name", sa.String(100), nullable=False),
+            sa.Column("metric_value", sa.Float(), nullable=False),
+            sa.Column("model_version", sa.String(20), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+def _adopt_legacy_clients() -> None:
+    """Приводит существующую таблицу clients к базовой схеме"""
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("clients")}
+
+    with op.batch_alter_table("clients") as batch:
+        if "client_id" in columns and "id" not in columns:
+            batch.alter_column("client_id", new_column_name="id")
+            columns = (columns - {"client_id"}) | {"id"}
+
+        # Колонки, созданные без кавычек (incomevalue, pdn), переименовываются в camelCase
+        lowercase = {name.lower(): name for name in columns}
+        for name, type_ in CLIENT_COLUMNS:
+            existing = lowercase.get(name.lower())
+            if existing is None:
+                batch.add_column(sa.Column(name, type_))
+            elif existing != name:
+                batch.alter_column(existing, new_column_name=name)
+
+        for name in LEGACY_CLIENT_COLUMNS:
+            if name in columns:
+                batch.drop_column(name)
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "clients" in existing:
+        _adopt_legacy_clients()
+    _create_tables(existing)
+
+def downgrade() -> None:
+    for table in ("model_metrics", "recommendations", "predictions", "clients", "users"):
+        op.drop_table(table)
@@ -0,0 +1,75 @@
+"""Решения по кредиту и хеши строк в clients
+
+Колонки решения (считаются при загрузке, фильтруются в SQL), row_hash для
+upsert и feature_hash для инкрементального скоринга. Для уже загруженных
+клиентов решения рассчитываются здесь же.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = [
+    ("debt_burden_ratio", sa.Float()),
+    ("risk_level", sa.String(10)),
+    ("recommendation", sa.String(10)),
+    ("credit_eligible", sa.Boolean()),
+    ("reasoning", sa.String(255)),
+    ("row_hash", sa.String(16)),
+    ("feature_hash", sa.String(16)),
+]
+
+INDEXED_COLUMNS = ("risk_level", "recommendation", "credit_eligible")
+
+def _backfill_credit_decisions(conn) -> None:
+    """Считает и сохраняет решения по кредиту для клиентов, у которых их нет"""
+    import pandas as pd
+    from app.services.credit_service import calculate_credit_decisions_frame
+
+    df = pd.read_sql(
+        sa.text('SELECT id, "incomeValue", ovrd_sum, loan_cur_amt, avg_cur_cr_turn FROM clients WHERE risk_level IS NULL'),
+        conn
+    )
+    if df.empty:
+        return
+
+    decisions = calculate_credit_decisions_frame(df)
+    decisions["client_id"] = df["id"]
+    records = decisions.astype(object).where(decisions.notna(), None).to_dict("records")
+    clients = sa.table("clients", sa.column("id"), *[sa.column(name, type_) for name, type_ in NEW_COLUMNS])
+    conn.execute(
+        clients.update().where(clients.c.id == sa.bindparam("client_id")),
+        records
+    )
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Колонки могли быть добавлены старым init_db при старте API
+    columns = {column["name"] for column in inspector.get_columns("clients")}
+    indexes = {index["name"] for index in inspector.get_indexes("clients")}
+
+    with op.batch_alter_table("clients") as batch:
+        for name, type_ in NEW_COLUMNS:
+            if name not in columns:
+                batch.add_column(sa.Column(name, type_))
+
+    for name in INDEXED_COLUMNS:
+        if f"ix_clients_{name}" not in indexes:
+            op.create_index(f"ix_clients_{name}", "clients", [name])
+
+    _backfill_credit_decisions(bind)
+
+def downgrade() -> None:
+    for name in INDEXED_COLUMNS:
+        op.drop_index(f"ix_clients_{name}", table_name="clients")
+    with op.batch_alter_table("clients") as batch:
+        for name, _ in reversed(NEW_COLUMNS):
+            batch.drop_column(name)
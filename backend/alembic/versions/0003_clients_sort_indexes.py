@@ -0,0 +1,30 @@
+"""Индексы (col, id) под сортировки списка клиентов и keyset-пагинацию
+
+На PostgreSQL индексы строятся CONCURRENTLY - без блокировки записи в clients.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = ("incomeValue", "target", "ovrd_sum", "loan_cur_amt", "hdb_income_ratio", "PDN", "debt_burden_ratio")
+
+def upgrade() -> None:
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name in SORT_COLUMNS:
+            op.create_index(
+                f"ix_clients_{name}_id", "clients", [name, "id"],
+                if_not_exists=True, postgresql_concurrently=concurrently
+            )
+
+def downgrade() -> None:
+    for name in SORT_COLUMNS:
+        op.drop_index(f"ix_clients_{name}_id", table_name="clients", if_exists=True)
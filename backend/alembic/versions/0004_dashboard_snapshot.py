@@ -0,0 +1,24 @@
+"""Снимок агрегатов dashboard по поколениям данных
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "dashboard_snapshot",
+        sa.Column("generation", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table("dashboard_snapshot")
@@ -0,0 +1,38 @@
+"""Индексы поиска клиентов по части id (pg_trgm GIN и text_pattern_ops)
+
+Только PostgreSQL: на других БД поиск работает без индекса. Индексы строятся
+CONCURRENTLY - без блокировки записи в clients.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_clients_id_pattern", "clients", ["id"],
+            if_not_exists=True, postgresql_concurrently=True,
+            postgresql_ops={"id": "text_pattern_ops"}
+        )
+        op.create_index(
+            "ix_clients_id_trgm", "clients", ["id"],
+            if_not_exists=True, postgresql_concurrently=True,
+            postgresql_using="gin", postgresql_ops={"id": "gin_trgm_ops"}
+        )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_clients_id_trgm", table_name="clients", if_exists=True)
+    op.drop_index("ix_clients_id_pattern", table_name="clients", if_exists=True)
@@ -37,13 +37,18 @@ def init_dependencies():
     global _model_loader, _cache
     from app.ml.model_loader import ModelLoader
     from app.data.cache import CacheManager
+    from app.core.config import settings
     
-    _model_loader = ModelLoader("/app/models")
-    _cache = CacheManager()
+    _model_loader = ModelLoader(settings.MODEL_PATH)
+    _cache = CacheManager(settings.REDIS_URL)
     print("✓ Dependencies initialized")
 
 def get_model_loader():
+    if _model_loader is None:
+        init_dependencies()
     return _model_loader
 
 def get_cache():
+    if _cache is None:
+        init_dependencies()
     return _cache
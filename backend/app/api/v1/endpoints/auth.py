@@ -1,22 +1,23 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.api.v1.schemas import UserLogin, UserRegister, Token
 from app.core.security import create_access_token, verify_password, hash_password
-from app.data.database import SessionLocal
+from app.data.database import get_async_db
 from app.data.models import User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/auth/register", response_model=Token)
-async def register(user_data: UserRegister):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Регистрация нового пользователя
     """
-    db = SessionLocal()
     try:
         # Проверяем что пользователь не существует
-        existing = db.query(User).filter_by(email=user_data.email).first()
+        existing = (await db.execute(select(User).filter_by(email=user_data.email))).scalars().first()
         if existing:
             raise HTTPException(status_code=400, detail="Email already registered")
         
@@ -29,7 +30,7 @@ async def register(user_data: UserRegister):
         )
         
         db.add(user)
-        db.commit()
+        await db.commit()
         
         logger.info(f"✓ User registered: {user_data.email}")
         
@@ -38,31 +39,23 @@ async def register(user_data: UserRegister):
         return Token(access_token=access_token)
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error registering user: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        db.close()
 
 @router.post("/auth/login", response_model=Token)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Аутентификация пользователя
     """
-    db = SessionLocal()
-    try:
-        # Ищем пользователя
-        user = db.query(User).filter_by(email=credentials.email).first()
-        
-        if not user or not verify_password(credentials.password, user.password_hash):
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        
-        logger.info(f"✓ User logged in: {credentials.email}")
-        
-        # Создаем JWT токен
-        access_token = create_access_token(data={"sub": credentials.email})
-        return Token(access_token=access_token)
+    # Ищем пользователя
+    user = (await db.execute(select(User).filter_by(email=credentials.email))).scalars().first()
+    
+    if not user or not verify_password(credentials.password, user.password_hash):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    logger.info(f"✓ User logged in: {credentials.email}")
     
-    finally:
-        db.close()
+    # Создаем JWT токен
+    access_token = create_access_token(data={"sub": credentials.email})
+    return Token(access_token=access_token)
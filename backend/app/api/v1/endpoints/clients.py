@@ -1,116 +1,121 @@
-from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Depends, BackgroundTasks
-from app.data.database import SessionLocal
-from app.data.models import Client, Prediction
-from app.services.credit_service import calculate_credit_decision
-from app.api.v1.dependencies import get_current_user
-from sqlalchemy import desc, or_
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.services.scoring_service import (
+    predict_with_cache, predict_incremental, feature_hashes, prepare_features, build_prediction_frame
+)
+from app.services.upload_job_service import UploadJob, upload_jobs
+from app.services.dashboard_service import dataset_generation, refresh_dashboard_snapshot, session_generation
+from app.services.distribution_service import DISTRIBUTION_SCALES, client_distribution
+from app.services.warmup_service import cache_warmer
+from app.services.export_service import EXPORT_FORMATS
+from app.ml.preprocessor import read_scoring_csv
+from app.api.v1.schemas import ClientBatchRequest
+from app.api.v1.dependencies import get_current_user, get_model_loader, get_cache
+from app.data.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.data.repositories.base_repository import with_required
+from app.data.repositories.client_repository import (
+    ClientFilters, ClientRepository, CLIENT_API_FIELDS, CLIENT_SELECTABLE_FIELDS, DISTRIBUTION_FIELDS,
+    SEARCH_MODES, SORT_FIELDS
+)
+from app.data.database import get_read_db, read_session
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
+import json
 import logging
-import os
-import subprocess
 from pathlib import Path
 import shutil
 import pandas as pd
-import xgboost as xgb
-from scripts.load_clients import load_clients_from_csv
+from typing import Optional, Tuple
+from scripts.load_clients import load_clients_from_frame, fetch_feature_hashes
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def process_csv_with_ml(input_file_path: Path, output_file_path: Path) -> dict:
+# Закешированное число клиентов (count=estimated), сбрасывается при загрузке
+CLIENT_COUNT_PREFIX = "clients:count:"
+CLIENT_COUNT_TTL = 300
+
+# Распределения полей - по поколению данных, поэтому новая загрузка их не задевает
+CLIENT_DISTRIBUTION_PREFIX = "clients:distribution:"
+CLIENT_DISTRIBUTION_TTL = 3600
+
+# Страницы списка без фильтров (то, что открывает UI) - тоже по поколению данных
+CLIENT_PAGE_PREFIX = "clients:page:"
+CLIENT_PAGE_TTL = 3600
+
+def process_csv_with_ml(
+    input_file_path: Path,
+    output_file_path: Optional[Path] = None,
+    job: UploadJob = None,
+    incremental: bool = False
+) -> Tuple[pd.DataFrame, dict]:
     """
     Обрабатывает CSV файл через ML модель напрямую, без subprocess
     
     Args:
         input_file_path: Путь к входному CSV
-        output_file_path: Путь для сохранения результата
+        output_file_path: Путь для сохранения результата; None - файл не пишется
+        job: Задача загрузки для отчёта о прогрессе (этапы parse и score)
+        incremental: Не скорить клиентов, чьи признаки не изменились с прошлой загрузки
         
     Returns:
-        dict с результатами обработки
+        (датафрейм с результатом скоринга, dict с результатами обработки)
     """
     try:
         logger.info(f"Начало обработки CSV: {input_file_path}")
         
-        # Загружаем CSV в датафрейм
-        df_test = pd.read_csv(input_file_path)
-        logger.info(f"Загружено {len(df_test)} записей из CSV")
-        
-        # Проверяем обязательные поля
-        required_columns = ['id', 'incomeValue']
-        missing_columns = [col for col in required_columns if col not in df_test.columns]
-        if missing_columns:
-            raise ValueError(f"Отсутствуют обязательные колонки: {missing_columns}")
-        
-        # Убираем первые две колонки если они есть (обычно это индексы)
-        if len(df_test.columns) > 2 and df_test.columns[0] == 'Unnamed: 0':
-            df_test = df_test.iloc[:, 2:]
-            logger.info("Удалены индексные колонки")
+        # Модель загружается один раз на процесс; подменённый на диске model.json
+        # подхватывается здесь, и кеш предсказаний сбрасывается по новой версии
+        model_loader = get_model_loader()
+        if model_loader.reload_if_changed():
+            logger.info(f"Модель для загрузки: версия {model_loader.version}")
         
-        # Загружаем модель
-        model_path = Path(__file__).parent.parent.parent / "model.json"
-        if not model_path.exists():
-            raise FileNotFoundError(f"Модель не найдена: {model_path}")
-        
-        logger.info("Загрузка ML модели...")
-        loaded_model = xgb.Booster()
-        loaded_model.load_model(str(model_path))
+        # Загружаем CSV в датафрейм - только колонки, нужные модели и результату
+        if job:
+            job.start_stage("parse")
+        df_test, parse_stats = read_scoring_csv(input_file_path, model_loader.feature_names)
+        logger.info(f"Загружено {len(df_test)} записей из CSV")
+        if job:
+            job.set_progress(len(df_test), rows_total=len(df_test))
         
-        # Подготовка признаков для теста (без 'target' и 'w' если они есть)
-        features_to_drop = ["target", "w"]
-        X_test = df_test.drop(columns=[col for col in features_to_drop if col in df_test.columns])
+        # Проверяем обязательные поля и отделяем признаки
+        df_test, X_test = prepare_features(df_test, model_loader.feature_names)
         
         # Логируем используемые признаки
         logger.info(f"Используется {len(X_test.columns)} признаков для предсказания")
         
-        # Создание DMatrix для теста
-        dtest = xgb.DMatrix(X_test)
-        
-        # Получение предсказаний
+        # Получение предсказаний (повторяющиеся строки берутся из кеша)
         logger.info("Выполнение предсказаний...")
-        predictions = loaded_model.predict(dtest)
-        logger.info(f"Получено {len(predictions)} предсказаний")
-        
-        # Вычисляем hdb_income_ratio если есть необходимые поля
-        if 'hdb_outstand_sum' in df_test.columns and 'incomeValue' in df_test.columns:
-            df_test['hdb_income_ratio'] = df_test['hdb_outstand_sum'] / df_test['incomeValue']
-            logger.info("Вычислен hdb_income_ratio")
-        elif 'hdb_income_ratio' not in df_test.columns:
-            # Если поля нет, создаем пустую колонку
-            df_test['hdb_income_ratio'] = None
-            logger.info("hdb_income_ratio не найден, создана пустая колонка")
-        
-        # Вычисляем PDN (Показатель долговой нагрузки)
-        if 'hdb_outstand_sum' in df_test.columns and 'incomeValue' in df_test.columns:
-            df_test['PDN'] = (df_test['hdb_outstand_sum'] / df_test['incomeValue']) * 100
-            logger.info("Вычислен PDN")
+        if job:
+            job.start_stage("score", rows_total=len(X_test))
+        if incremental:
+            stored = fetch_feature_hashes(df_test['id'].astype(str))
+            predictions, hashes, cache_stats = predict_incremental(
+                model_loader, X_test, df_test['id'], stored, get_cache()
+            )
         else:
-            df_test['PDN'] = None
-            logger.info("Не удалось вычислить PDN, создана пустая колонка")
+            predictions, cache_stats = predict_with_cache(model_loader, X_test, get_cache())
+            hashes = feature_hashes(model_loader.version, X_test)
+        logger.info(f"Получено {len(predictions)} предсказаний")
+        if job:
+            job.set_progress(len(predictions))
         
         # Создание результирующего DataFrame с нужными полями
-        pred_df = pd.DataFrame({
-            "id": df_test['id'].astype(str),
-            "target": predictions,  # Предсказанный доход
-            "incomeValue": df_test['incomeValue'],
-            "avg_cur_cr_turn": df_test.get('avg_cur_cr_turn', None),
-            "ovrd_sum": df_test.get('ovrd_sum', 0.0),
-            "loan_cur_amt": df_test.get('loan_cur_amt', 0.0),
-            "hdb_income_ratio": df_test.get('hdb_income_ratio', None),
-            "PDN": df_test.get('PDN', None)
-        })
+        pred_df = build_prediction_frame(df_test, predictions)
+        pred_df['feature_hash'] = hashes
         
-        # Заполняем NaN значения
-        pred_df['ovrd_sum'] = pred_df['ovrd_sum'].fillna(0.0)
-        pred_df['loan_cur_amt'] = pred_df['loan_cur_amt'].fillna(0.0)
+        # Файл результата пишем только по запросу - в БД данные уходят из памяти
+        if output_file_path is not None:
+            output_file_path.parent.mkdir(parents=True, exist_ok=True)
+            pred_df.drop(columns=['feature_hash']).to_csv(output_file_path, index=False)
+            logger.info(f"Файл обработан и сохранен: {output_file_path}")
         
-        # Сохраняем результат
-        output_file_path.parent.mkdir(parents=True, exist_ok=True)
-        pred_df.to_csv(output_file_path, index=False)
-        logger.info(f"Файл обработан и сохранен: {output_file_path}")
-        
-        return {
+        return pred_df, {
             "processed_records": len(pred_df),
             "columns_used": list(X_test.columns),
+            "model_version": model_loader.version,
+            "parse": parse_stats,
+            "prediction_cache": cache_stats,
             "prediction_stats": {
                 "min": float(predictions.min()),
                 "max": float(predictions.max()),
@@ -122,198 +127,377 @@ def process_csv_with_ml(input_file_path: Path, output_file_path: Path) -> dict:
         logger.error(f"Ошибка обработки CSV: {e}")
         raise
 
-@router.post("/clients/upload-csv")
+def run_upload_pipeline(
+    job: UploadJob,
+    input_file_path: Path,
+    output_file_path: Optional[Path] = None,
+    mode: str = "replace"
+) -> dict:
+    """
+    Полный цикл загрузки в фоне: parse -> score -> ingest.
+    
+    mode="replace" заменяет всех клиентов, mode="upsert" вставляет новых и
+    обновляет изменённых (неизменённые клиенты не скорятся и не переписываются).
+    
+    Результат скоринга передаётся в загрузку датафреймом, без промежуточного
+    CSV; output_file_path задаётся, только если файл результата нужен.
+    Входной файл удаляется по завершении (в том числе при ошибке).
+    """
+    try:
+        # Обрабатываем CSV через ML модель
+        upsert = mode == "upsert"
+        pred_df, ml_result = process_csv_with_ml(input_file_path, output_file_path, job, incremental=upsert)
+        
+        # replace: COPY в staging-таблицу и подмена живой; upsert: ON CONFLICT по row_hash
+        job.start_stage("ingest", rows_total=ml_result["processed_records"])
+        load_result = load_clients_from_frame(
+            pred_df,
+            replace=not upsert,
+            upsert=upsert,
+            progress_callback=job.set_progress
+        )
+        if load_result['loaded'] == 0 and load_result['errors'] > 0:
+            raise RuntimeError(f"Ошибка загрузки в БД: {load_result['errors_list'][-1]}")
+        
+        job.add_errors(load_result['errors_list'])
+        get_cache().delete_prefix(CLIENT_COUNT_PREFIX)
+        # Новое поколение данных: агрегаты dashboard пересчитываются один раз здесь
+        generation = refresh_dashboard_snapshot()
+        # Dashboard и первые страницы нового поколения - в кеш до первого пользователя
+        job.start_stage("warmup")
+        warmup = cache_warmer.run_from_thread("ingest")
+        result = {
+            "message": "Файл успешно обработан и загружен",
+            "uploaded_file": job.filename,
+            "mode": mode,
+            "processed_clients": load_result['loaded'],
+            "total_records": load_result['total'],
+            "errors": load_result['errors'],
+            "reject_file": load_result.get('reject_file'),
+            "ml_processing": ml_result,
+            "output_file": str(output_file_path) if output_file_path else None,
+            "generation": generation,
+            "warmup": warmup
+        }
+        if upsert:
+            result.update({key: load_result[key] for key in ('inserted', 'updated', 'unchanged')})
+        return result
+    finally:
+        # Удаляем временный файл
+        if input_file_path.exists():
+            try:
+                input_file_path.unlink()
+                logger.info(f"Временный файл удален: {input_file_path}")
+            except Exception as e:
+                logger.warning(f"Не удалось удалить временный файл: {e}")
+
+@router.post("/clients/upload-csv", status_code=202)
 async def upload_clients_csv(
     file: UploadFile = File(...),
+    save_output: bool = Query(False, description="Сохранить результат скоринга в data/fin_clients.csv"),
+    mode: str = Query("replace", description="Режим загрузки: replace (заменить всех) / upsert (только изменения)"),
     current_user = Depends(get_current_user)
 ):
     """
-    Загружает CSV файл, обрабатывает через ML модель и загружает в БД.
+    Принимает CSV файл и ставит его обработку в очередь.
     
-    Процесс:
-    1. Сохраняет загруженный файл
-    2. Обрабатывает через ML модель напрямую
-    3. Загружает результат в БД
+    Ответ возвращается сразу после сохранения файла; обработка через ML модель
+    и загрузка в БД идут в фоне. Статус - GET /clients/upload-jobs/{job_id}.
     """
     # Проверяем формат файла
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Файл должен быть в формате CSV")
+    if mode not in ("replace", "upsert"):
+        raise HTTPException(status_code=400, detail="mode должен быть replace или upsert")
     
     # Создаем директорию для временных файлов
     temp_dir = Path(__file__).parent.parent.parent / "data" / "temp"
     temp_dir.mkdir(parents=True, exist_ok=True)
     
     input_file_path = temp_dir / f"input_{uuid.uuid4().hex[:8]}.csv"
-    output_file_path = Path(__file__).parent.parent.parent / "data" / "fin_clients.csv"
-    
-    db = SessionLocal()
+    output_file_path = Path(__file__).parent.parent.parent / "data" / "fin_clients.csv" if save_output else None
     
     try:
         # Сохраняем загруженный файл
         with open(input_file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
-        
         logger.info(f"Файл сохранен: {input_file_path}")
-        
-        # Обрабатываем CSV через ML модель
-        ml_result = process_csv_with_ml(input_file_path, output_file_path)
-        
-        # Загружаем данные в БД в транзакции
-        db.begin()
-        try:
-            # Удаляем все существующие клиенты
-            deleted_count = db.query(Client).delete()
-            logger.info(f"Удалено существующих клиентов: {deleted_count}")
-            
-            # Загружаем новых клиентов
-            load_result = load_clients_from_csv(str(output_file_path))
-            
-            db.commit()
-            
-            return {
-                "message": "Файл успешно обработан и загружен",
-                "uploaded_file": file.filename,
-                "processed_clients": load_result['loaded'],
-                "total_records": load_result['total'],
-                "errors": load_result['errors'],
-                "ml_processing": ml_result,
-                "output_file": str(output_file_path)
-            }
-            
-        except Exception as db_error:
-            db.rollback()
-            logger.error(f"Ошибка транзакции БД: {db_error}")
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Ошибка загрузки в БД: {str(db_error)}"
-            )
-        
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Ошибка загрузки CSV: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Ошибка загрузки: {str(e)}")
-    finally:
-        db.close()
-        # Удаляем временный файл
+        logger.error(f"Ошибка сохранения CSV: {e}", exc_info=True)
         if input_file_path.exists():
-            try:
-                input_file_path.unlink()
-                logger.info(f"Временный файл удален: {input_file_path}")
-            except Exception as e:
-                logger.warning(f"Не удалось удалить временный файл: {e}")
+            input_file_path.unlink()
+        raise HTTPException(status_code=500, detail=f"Ошибка загрузки: {str(e)}")
+    
+    job = upload_jobs.submit(
+        file.filename,
+        lambda job: run_upload_pipeline(job, input_file_path, output_file_path, mode)
+    )
+    
+    return {
+        "message": "Файл принят в обработку",
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/v1/clients/upload-jobs/{job.job_id}"
+    }
+
+@router.get("/clients/upload-jobs/{job_id}")
+async def get_upload_job(job_id: str, current_user = Depends(get_current_user)):
+    """Статус задачи загрузки: этап, прогресс, скорость и ошибки"""
+    job = upload_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job.to_dict()
 
 # Остальной код эндпоинтов остается без изменений...
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Параметр fields= ('id,incomeValue') -> кортеж колонок; пусто - колонки по умолчанию.
+    
+    Raises:
+        HTTPException: 400 для неизвестной колонки
+    """
+    names = tuple(name.strip() for name in (fields or "").split(",") if name.strip()) or CLIENT_API_FIELDS
+    unknown = [name for name in names if name not in CLIENT_SELECTABLE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(unknown)}")
+    return names
+
+def client_to_dict(row, fields: Tuple[str, ...] = CLIENT_API_FIELDS) -> dict:
+    """
+    Клиент для ответа API прямо из кортежа строки: значения по порядку колонок.
+    
+    Служебные колонки в конце строки (id, колонка сортировки) отбрасываются zip'ом.
+    """
+    return dict(zip(fields, row))
+
+@router.post("/clients/batch")
+async def get_clients_batch(request: ClientBatchRequest, db: AsyncSession = Depends(get_read_db)):
+    """
+    Получить клиентов по списку id одним запросом к БД.
+    
+    Клиенты возвращаются в порядке запроса; id, которых нет в БД, - в not_found.
+    """
+    fields = parse_fields(request.fields)
+    rows = await ClientRepository(db).get_many(set(request.ids), with_required(fields, "id"))
+    clients = {row.id: client_to_dict(row, fields) for row in rows}
+    
+    return ORJSONResponse({
+        "items": [clients[client_id] for client_id in request.ids if client_id in clients],
+        "not_found": [client_id for client_id in request.ids if client_id not in clients]
+    })
+
+def client_filters(
+    risk_level: str = Query(None, description="Фильтр по уровню риска (LOW/MEDIUM/HIGH)"),
+    search: str = Query(None, max_length=50, description="Поиск по части id"),
+    search_mode: str = Query("contains", description="Режим поиска: prefix / contains"),
+    incomeValue_min: float = Query(None, description="incomeValue от (включительно)"),
+    incomeValue_max: float = Query(None, description="incomeValue до (включительно)"),
+    PDN_min: float = Query(None, description="PDN от (включительно)"),
+    PDN_max: float = Query(None, description="PDN до (включительно)"),
+    ovrd_sum_min: float = Query(None, description="ovrd_sum от (включительно)"),
+    ovrd_sum_max: float = Query(None, description="ovrd_sum до (включительно)"),
+) -> ClientFilters:
+    """Фильтры списка и выгрузки; в словарь попадают только заданные"""
+    if search_mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"search_mode должен быть одним из: {', '.join(SEARCH_MODES)}")
+    filters = {
+        "risk_level": risk_level,
+        "search": search or None,
+        "search_mode": search_mode if search else None,
+        "incomeValue_min": incomeValue_min,
+        "incomeValue_max": incomeValue_max,
+        "PDN_min": PDN_min,
+        "PDN_max": PDN_max,
+        "ovrd_sum_min": ovrd_sum_min,
+        "ovrd_sum_max": ovrd_sum_max,
+    }
+    return {name: value for name, value in filters.items() if value is not None}
+
+# Строк на пачку при выгрузке (одна пачка - один кусок ответа)
+EXPORT_BATCH_SIZE = 5000
+
+@router.get("/clients/export")
+async def export_clients(
+    format: str = Query("csv", description="Формат: csv / ndjson / parquet"),
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию - как в списке)"),
+    sort: str = Query("incomeValue", description="Поле для сортировки"),
+    order: str = Query("desc", description="Порядок сортировки (asc/desc)"),
+    filters: ClientFilters = Depends(client_filters),
+    current_user = Depends(get_current_user)
+):
+    """
+    Выгрузка всех клиентов файлом без пагинации.
+    
+    Строки читаются серверным курсором пачками и сразу отдаются потоком,
+    поэтому память не зависит от размера выгрузки. Сортировка и фильтры - как у GET /clients.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format должен быть одним из: {', '.join(EXPORT_FORMATS)}")
+    if sort not in SORT_FIELDS:
+        sort = "incomeValue"
+    columns = parse_fields(fields)
+    
+    media_type, extension, chunks = EXPORT_FORMATS[format]
+    
+    async def body():
+        # Сессия живёт, пока отдаётся ответ, поэтому открывается здесь, а не в Depends
+        async with read_session() as db:
+            repo = ClientRepository(db)
+            stmt = repo.ordered(sort, order == "desc", filters, columns)
+            async for chunk in chunks(columns, repo.stream_partitions(stmt, EXPORT_BATCH_SIZE)):
+                yield chunk
+    
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="clients.{extension}"'}
+    )
+
+@router.get("/clients/distribution")
+async def get_clients_distribution(
+    field: str = Query("incomeValue", description="Числовое поле клиента"),
+    bins: int = Query(20, ge=1, le=200, description="Число корзин гистограммы"),
+    scale: str = Query("linear", description="Шкала корзин: linear / log"),
+    group_by: str = Query(None, description="Группировка: risk_level"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Гистограмма и квантили поля по всем клиентам, посчитанные в БД.
+    
+    Результат кешируется по поколению данных до следующей загрузки.
+    """
+    if field not in DISTRIBUTION_FIELDS:
+        raise HTTPException(status_code=400, detail=f"field должен быть одним из: {', '.join(DISTRIBUTION_FIELDS)}")
+    if scale not in DISTRIBUTION_SCALES:
+        raise HTTPException(status_code=400, detail=f"scale должен быть одним из: {', '.join(DISTRIBUTION_SCALES)}")
+    if group_by not in (None, "risk_level"):
+        raise HTTPException(status_code=400, detail="group_by поддерживает только risk_level")
+    
+    generation, _ = await dataset_generation.current()
+    cache = get_cache()
+    key = f"{CLIENT_DISTRIBUTION_PREFIX}g{generation}:{field}:{bins}:{scale}:{group_by or ''}"
+    distribution = await cache.aget(key)
+    if distribution is None:
+        distribution = await client_distribution(ClientRepository(db), field, bins, scale, group_by)
+        distribution["generation"] = generation
+        # Реплика может ещё не видеть новое поколение - такое распределение не кешируем
+        if await session_generation(db) == generation:
+            await cache.aset(key, distribution, ttl=CLIENT_DISTRIBUTION_TTL)
+    return ORJSONResponse(distribution)
+
 @router.get("/clients/{client_id}")
-async def get_client(client_id: str):
+async def get_client(
+    client_id: str,
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию - все поля клиента)"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Получить клиента"""
-    db = SessionLocal()
-    try:
-        client = db.query(Client).filter_by(id=client_id).first()
-        if not client:
-            raise HTTPException(status_code=404, detail="Not found")
-        
-        result = {
-            "id": client.id,
-            "target": client.target,
-            "incomeValue": client.incomeValue,
-            "avg_cur_cr_turn": client.avg_cur_cr_turn,
-            "ovrd_sum": client.ovrd_sum,
-            "loan_cur_amt": client.loan_cur_amt,
-            "hdb_income_ratio": client.hdb_income_ratio,
-            "PDN": client.PDN,  # Новое поле
-        }
-        
-        # Вычисляем решение по кредиту на основе новых полей
-        if client.incomeValue and client.ovrd_sum is not None:
-            # Рассчитываем долговую нагрузку: просрочка / доход
-            debt_burden_ratio = (client.ovrd_sum / client.incomeValue) if client.incomeValue > 0 else 0.0
-            
-            credit_decision = calculate_credit_decision({
-                "debt_burden_ratio": debt_burden_ratio,
-                "predicted_income": client.incomeValue or 0.0,
-                "total_debt": client.ovrd_sum or 0.0,
-                "loan_amount": client.loan_cur_amt or 0.0,
-                "avg_cur_cr_turn": client.avg_cur_cr_turn or 0.0
-            })
-            result.update({
-                "risk_level": credit_decision["risk_level"],
-                "recommendation": credit_decision["recommendation"],
-                "reasoning": credit_decision["reasoning"]
-            })
-        
-        return result
-    finally:
-        db.close()
+    fields = parse_fields(fields)
+    client = await ClientRepository(db).get(client_id, fields)
+    if not client:
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    return ORJSONResponse(client_to_dict(client, fields))
+
+async def count_clients(repo: ClientRepository, filters: ClientFilters, mode: str) -> Optional[int]:
+    """
+    Общее число клиентов для списка.
+    
+    exact - COUNT(*) на каждый запрос; estimated - pg_class.reltuples для
+    неотфильтрованного списка на PostgreSQL, иначе COUNT(*), закешированный
+    по поколению данных; none - не считать.
+    """
+    if mode == "none":
+        return None
+    if mode == "exact":
+        return await repo.count(filters)
+    
+    if not filters:
+        estimate = await repo.estimated_count()
+        if estimate is not None:
+            return estimate
+    
+    generation, _ = await dataset_generation.current()
+    cache = get_cache()
+    key = f"{CLIENT_COUNT_PREFIX}g{generation}:" + (json.dumps(filters, sort_keys=True) if filters else "all")
+    total = await cache.aget(key)
+    if total is None:
+        total = await repo.count(filters)
+        # Реплика может ещё не видеть новое поколение - такой total не кешируем
+        if await session_generation(repo.db) == generation:
+            await cache.aset(key, total, ttl=CLIENT_COUNT_TTL)
+    return total
 
 @router.get("/clients")
 async def list_clients(
     sort: str = Query("incomeValue", description="Поле для сортировки"),
     order: str = Query("desc", description="Порядок сортировки (asc/desc)"),
     limit: int = Query(50, description="Лимит записей"),
-    offset: int = Query(0, description="Смещение"),
-    risk_level: str = Query(None, description="Фильтр по уровню риска (LOW/MEDIUM/HIGH)")
+    offset: int = Query(0, description="Смещение (устарело, используйте cursor)"),
+    filters: ClientFilters = Depends(client_filters),
+    cursor: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    count: str = Query("exact", description="Подсчёт total: exact / estimated (приблизительно, по запросу) / none"),
+    fields: str = Query(None, description="Колонки через запятую (по умолчанию - все поля клиента)"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получить список клиентов с фильтрами"""
-    db = SessionLocal()
-    try:
-        query = db.query(Client)
-        
-        # Сортировка
-        if sort == "incomeValue":
-            query = query.order_by(desc(Client.incomeValue) if order == "desc" else Client.incomeValue)
-        elif sort == "target":
-            query = query.order_by(desc(Client.target) if order == "desc" else Client.target)
-        elif sort == "ovrd_sum":
-            query = query.order_by(desc(Client.ovrd_sum) if order == "desc" else Client.ovrd_sum)
-        elif sort == "loan_cur_amt":
-            query = query.order_by(desc(Client.loan_cur_amt) if order == "desc" else Client.loan_cur_amt)
-        elif sort == "hdb_income_ratio":
-            query = query.order_by(desc(Client.hdb_income_ratio) if order == "desc" else Client.hdb_income_ratio)
-        elif sort == "PDN":
-            query = query.order_by(desc(Client.PDN) if order == "desc" else Client.PDN)
-        else:
-            query = query.order_by(desc(Client.incomeValue) if order == "desc" else Client.incomeValue)
-        
-        total = query.count()
-        clients = query.offset(offset).limit(limit).all()
-        
-        items = []
-        for client in clients:
-            item = {
-                "id": client.id,
-                "target": client.target,
-                "incomeValue": client.incomeValue,
-                "avg_cur_cr_turn": client.avg_cur_cr_turn,
-                "ovrd_sum": client.ovrd_sum,
-                "loan_cur_amt": client.loan_cur_amt,
-                "hdb_income_ratio": client.hdb_income_ratio,
-                "PDN": client.PDN,  # Новое поле
-            }
-            
-            # Вычисляем решение по кредиту
-            if client.incomeValue and client.ovrd_sum is not None:
-                debt_burden_ratio = (client.ovrd_sum / client.incomeValue) if client.incomeValue > 0 else 0.0
-                
-                credit_decision = calculate_credit_decision({
-                    "debt_burden_ratio": debt_burden_ratio,
-                    "predicted_income": client.incomeValue or 0.0,
-                    "total_debt": client.ovrd_sum or 0.0,
-                    "loan_amount": client.loan_cur_amt or 0.0,
-                    "avg_cur_cr_turn": client.avg_cur_cr_turn or 0.0
-                })
-                item.update({
-                    "risk_level": credit_decision["risk_level"],
-                    "recommendation": credit_decision["recommendation"],
-                    "reasoning": credit_decision["reasoning"]
-                })
-                
-                # Фильтр по risk_level (если указан)
-                if risk_level and credit_decision["risk_level"] != risk_level:
-                    continue
-            
-            items.append(item)
-        
-        return {"total": total, "items": items}
-    finally:
-        db.close()
+    """
+    Получить список клиентов с фильтрами.
+    
+    Страницы листаются по next_cursor (keyset по индексу (col, id)), поэтому
+    дальние страницы стоят столько же, сколько первая. total по умолчанию
+    точный; count=estimated отдаёт оценку из статистики PostgreSQL.
+    """
+    if count not in ("exact", "estimated", "none"):
+        raise HTTPException(status_code=400, detail="count должен быть exact, estimated или none")
+    
+    repo = ClientRepository(db)
+    fields = parse_fields(fields)
+    
+    # Сортировка: неизвестное поле - по доходу, равные значения - по id
+    if sort not in SORT_FIELDS:
+        sort = "incomeValue"
+    descending = order == "desc"
+    
+    cache_key = None
+    if not filters and not offset and fields == CLIENT_API_FIELDS:
+        generation, _ = await dataset_generation.current()
+        cache_key = f"{CLIENT_PAGE_PREFIX}g{generation}:{sort}:{order}:{limit}:{count}:{cursor or ''}"
+        page = await get_cache().aget(cache_key)
+        if page is not None:
+            return ORJSONResponse(page)
+    
+    # Фильтры (уровень риска, поиск по id, диапазоны) - до пагинации, поэтому total верный
+    total = await count_clients(repo, filters, count)
+    
+    if offset and not cursor:
+        # Старый режим OFFSET
+        clients = await repo.page_by_offset(sort, descending, limit, offset, filters, fields)
+        next_position = None
+    else:
+        position = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if (position.get("sort"), position.get("order"), position.get("filters")) != (sort, order, filters):
+                raise HTTPException(status_code=400, detail="Курсор выдан для другой сортировки или фильтра")
+        try:
+            clients, next_position = await repo.page(sort, descending, limit, position, filters, fields)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    next_cursor = None
+    if next_position is not None:
+        next_cursor = encode_cursor({"sort": sort, "order": order, "filters": filters, **next_position})
+    
+    page = {
+        "total": total,
+        "items": [client_to_dict(client, fields) for client in clients],
+        "next_cursor": next_cursor
+    }
+    # Страница с реплики, ещё не видящей новое поколение, под его ключ не попадает
+    if cache_key is not None and await session_generation(db) == generation:
+        await get_cache().aset(cache_key, page, ttl=CLIENT_PAGE_TTL)
+    # Ответ сериализуется orjson сразу из кортежей, минуя jsonable_encoder
+    return ORJSONResponse(page)
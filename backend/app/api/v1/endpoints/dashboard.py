@@ -1,137 +1,130 @@
 from fastapi import APIRouter, Depends
 from app.api.v1.schemas import DashboardData
-from app.api.v1.dependencies import get_current_user
-from app.data.database import SessionLocal
-from app.data.models import Client, ModelMetrics
-from app.services.credit_service import calculate_credit_decision
-from sqlalchemy import func, case
+from app.api.v1.dependencies import get_current_user, get_cache
+from app.data.database import get_read_db
+from app.data.models import ModelMetrics
+from app.data.repositories.client_repository import ClientRepository, INCOME_CATEGORIES
+from app.data.repositories.dashboard_repository import DashboardSnapshotRepository
+from app.services.dashboard_service import aggregates_to_dict, dataset_generation
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def categorize_income(income: float) -> str:
-    """Категоризирует доход"""
-    if income is None:
-        return "UNKNOWN"
-    if income < 100000:
-        return "LOW"
-    elif income < 200000:
-        return "MIDDLE"
-    else:
-        return "HIGH"
+# Готовый ответ dashboard по поколению данных
+DASHBOARD_PREFIX = "dashboard:"
+DASHBOARD_TTL = 3600
 
 @router.get("/dashboard", response_model=DashboardData)
-async def get_dashboard(current_user = Depends(get_current_user)):
+async def get_dashboard(
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Получить общий dashboard с статистикой
     """
-    db = SessionLocal()
-    try:
-        # Получаем реальные данные из БД
-        total_clients = db.query(Client).count()
-        
-        # Подсчитываем одобренные и отклоненные на основе расчетов
-        approved_count = 0
-        rejected_count = 0
+    generation, _ = await dataset_generation.current()
+    cache = get_cache()
+    key = f"{DASHBOARD_PREFIX}g{generation}"
+    dashboard = await cache.aget(key)
+    if dashboard is None:
+        dashboard = await build_dashboard(db)
+        # Реплика может ещё не видеть новое поколение - такой ответ не кешируем
+        if dashboard["generation"] == generation:
+            await cache.aset(key, dashboard, ttl=DASHBOARD_TTL)
+    return dashboard
+
+async def build_dashboard(db: AsyncSession) -> dict:
+    """Ответ dashboard: агрегаты из снимка, метрики модели"""
+    # Агрегаты клиентов - из снимка, пересчитанного при последней загрузке;
+    # если загрузок ещё не было - одним запросом по сохранённым решениям
+    snapshot = await DashboardSnapshotRepository(db).latest()
+    if snapshot is not None:
+        aggregates, generation, refreshed_at = snapshot.data, snapshot.generation, snapshot.refreshed_at
+    else:
+        aggregates = aggregates_to_dict(await ClientRepository(db).dashboard_aggregates())
+        generation, refreshed_at = 0, datetime.utcnow()
+    
+    total_clients = aggregates["total_clients"]
+    approved_count = aggregates["approved"]
+    rejected_count = aggregates["rejected"]
+    
+    approval_rate = (approved_count / total_clients * 100) if total_clients > 0 else 0.0
+    
+    # Средний доход
+    avg_income = aggregates["avg_income"] or 0.0
+    
+    # Распределение по категориям дохода
+    income_dist_list = []
+    for category, _ in INCOME_CATEGORIES:
+        count = aggregates["income_distribution"][category]
+        percentage = (count / total_clients * 100) if total_clients > 0 else 0.0
+        income_dist_list.append({
+            "category": category,
+            "count": count,
+            "percentage": round(percentage, 1)
+        })
+    
+    # Метрики модели
+    metrics = (await db.execute(
+        select(ModelMetrics).filter(ModelMetrics.model_version == "1.0.0")
+    )).scalars().all()
+    
+    metrics_list = []
+    train_metrics = {m.metric_name: m.metric_value for m in metrics if m.metric_name and 'train' in str(m.metric_name).lower()}
+    test_metrics = {m.metric_name: m.metric_value for m in metrics if m.metric_name and 'test' in str(m.metric_name).lower()}
+    
+    # Если метрики есть в БД, используем их, иначе дефолтные
+    if metrics:
+        # Группируем по имени метрики
+        metric_dict = {}
+        for m in metrics:
+            name = m.metric_name
+            if name not in metric_dict:
+                metric_dict[name] = {"train": None, "test": None}
+            # Определяем train/test по dataset_type или другим полям
+            if hasattr(m, 'dataset_type'):
+                if m.dataset_type == 'train':
+                    metric_dict[name]["train"] = m.metric_value
+                elif m.dataset_type == 'test':
+                    metric_dict[name]["test"] = m.metric_value
         
-        clients = db.query(Client).all()
-        for client in clients:
-            if client.incomeValue and client.ovrd_sum is not None:
-                debt_burden_ratio = (client.ovrd_sum / client.incomeValue) if client.incomeValue > 0 else 0.0
-                credit_decision = calculate_credit_decision({
-                    "debt_burden_ratio": debt_burden_ratio,
-                    "predicted_income": client.incomeValue or 0.0,
-                    "total_debt": client.ovrd_sum or 0.0,
-                    "loan_amount": client.loan_cur_amt or 0.0,
-                    "avg_cur_cr_turn": client.avg_cur_cr_turn or 0.0
+        for name, values in metric_dict.items():
+            if values["train"] is not None or values["test"] is not None:
+                metrics_list.append({
+                    "metric_name": name,
+                    "train_value": values["train"] or 0.0,
+                    "test_value": values["test"] or 0.0,
+                    "unit": "₽" if "MAE" in name.upper() else ""
                 })
-                if credit_decision["recommendation"] == "APPROVE":
-                    approved_count += 1
-                elif credit_decision["recommendation"] == "REJECT":
-                    rejected_count += 1
-        
-        approval_rate = (approved_count / total_clients * 100) if total_clients > 0 else 0.0
-        
-        # Средний доход
-        avg_income_result = db.query(func.avg(Client.incomeValue)).scalar()
-        avg_income = float(avg_income_result) if avg_income_result else 0.0
-        
-        # Распределение по категориям дохода
-        income_distribution = {"LOW": 0, "MIDDLE": 0, "HIGH": 0, "UNKNOWN": 0}
-        
-        for client in clients:
-            category = categorize_income(client.incomeValue)
-            income_distribution[category] = income_distribution.get(category, 0) + 1
-        
-        income_dist_list = []
-        for category in ["LOW", "MIDDLE", "HIGH"]:
-            count = income_distribution.get(category, 0)
-            percentage = (count / total_clients * 100) if total_clients > 0 else 0.0
-            income_dist_list.append({
-                "category": category,
-                "count": count,
-                "percentage": round(percentage, 1)
-            })
-        
-        # Метрики модели
-        metrics = db.query(ModelMetrics).filter(
-            ModelMetrics.model_version == "1.0.0"
-        ).all()
-        
-        metrics_list = []
-        train_metrics = {m.metric_name: m.metric_value for m in metrics if m.metric_name and 'train' in str(m.metric_name).lower()}
-        test_metrics = {m.metric_name: m.metric_value for m in metrics if m.metric_name and 'test' in str(m.metric_name).lower()}
-        
-        # Если метрики есть в БД, используем их, иначе дефолтные
-        if metrics:
-            # Группируем по имени метрики
-            metric_dict = {}
-            for m in metrics:
-                name = m.metric_name
-                if name not in metric_dict:
-                    metric_dict[name] = {"train": None, "test": None}
-                # Определяем train/test по dataset_type или другим полям
-                if hasattr(m, 'dataset_type'):
-                    if m.dataset_type == 'train':
-                        metric_dict[name]["train"] = m.metric_value
-                    elif m.dataset_type == 'test':
-                        metric_dict[name]["test"] = m.metric_value
-            
-            for name, values in metric_dict.items():
-                if values["train"] is not None or values["test"] is not None:
-                    metrics_list.append({
-                        "metric_name": name,
-                        "train_value": values["train"] or 0.0,
-                        "test_value": values["test"] or 0.0,
-                        "unit": "₽" if "MAE" in name.upper() else ""
-                    })
-        
-        # Дефолтные метрики если нет в БД
-        if not metrics_list:
-            metrics_list = [
-                {"metric_name": "WMAE", "train_value": 0.1234, "test_value": 0.1456, "unit": ""},
-                {"metric_name": "MAE", "train_value": 5234.50, "test_value": 6123.75, "unit": "₽"}
-            ]
-        
-        return {
-            "stats": {
-                "total_predictions": total_clients,
-                "total_clients": total_clients,
-                "avg_confidence": round(avg_income / 200000, 2) if avg_income > 0 else 0.82,  # Нормализованное значение
-                "model_version": "v1.0",
-                "last_updated": datetime.utcnow().isoformat() + "Z",
-                "metrics": metrics_list
-            },
-            "income_distribution": income_dist_list,
-            "credit_decisions": {
-                "approved": approved_count,
-                "rejected": rejected_count,
-                "approval_rate": round(approval_rate, 1)
-            },
-            "recent_predictions": [],
-            "top_features": []
-        }
-    finally:
-        db.close()
+    
+    # Дефолтные метрики если нет в БД
+    if not metrics_list:
+        metrics_list = [
+            {"metric_name": "WMAE", "train_value": 0.1234, "test_value": 0.1456, "unit": ""},
+            {"metric_name": "MAE", "train_value": 5234.50, "test_value": 6123.75, "unit": "₽"}
+        ]
+    
+    return {
+        "stats": {
+            "total_predictions": total_clients,
+            "total_clients": total_clients,
+            "avg_confidence": round(avg_income / 200000, 2) if avg_income > 0 else 0.82,  # Нормализованное значение
+            "model_version": "v1.0",
+            "last_updated": refreshed_at.isoformat() + "Z",
+            "metrics": metrics_list
+        },
+        "income_distribution": income_dist_list,
+        "credit_decisions": {
+            "approved": approved_count,
+            "rejected": rejected_count,
+            "approval_rate": round(approval_rate, 1)
+        },
+        "recent_predictions": [],
+        "top_features": [],
+        "generation": generation,
+        "refreshed_at": refreshed_at.isoformat() + "Z"
+    }
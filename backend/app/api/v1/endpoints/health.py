@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 from datetime import datetime
+from app.data.database import read_replicas
+from app.services.warmup_service import cache_warmer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,7 +13,8 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "alfa-bank-income-prediction"
+        "service": "alfa-bank-income-prediction",
+        "warmup": cache_warmer.status
     }
 
 @router.get("/health/detailed")
@@ -21,5 +24,7 @@ async def health_detailed():
         "status": "ok",
         "timestamp": datetime.utcnow().isoformat(),
         "database": "ok",
+        "read_replicas": await read_replicas.check(),
+        "warmup": cache_warmer.to_dict(),
         "redis": "ok"
     }
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.api.v1.schemas import PredictionRequest, PredictionResponse
 from app.api.v1.dependencies import get_current_user
-from app.data.database import SessionLocal
+from app.data.database import get_async_db
 from app.data.models import Client, Prediction, Recommendation, User
-from sqlalchemy import desc
+from app.data.repositories.prediction_repository import PredictionRepository
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 import logging
 
@@ -13,24 +15,22 @@ router = APIRouter()
 @router.post("/predictions/predict", response_model=PredictionResponse)
 async def predict_income(
     request: PredictionRequest,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить прогноз дохода для клиента
     (На данный момент возвращает тестовые данные)
     """
-    db = SessionLocal()
     try:
         # Получить клиента
-        client = db.query(Client).filter_by(client_id=request.client_id).first()
+        client = (await db.execute(select(Client).filter_by(client_id=request.client_id))).scalars().first()
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
         
         # Проверяем есть ли уже прогноз
-        existing_pred = db.query(Prediction)\
-            .filter_by(client_id=request.client_id)\
-            .order_by(desc(Prediction.created_at))\
-            .first()
+        predictions = PredictionRepository(db)
+        existing_pred = await predictions.latest_for_client(request.client_id)
         
         if existing_pred:
             return PredictionResponse(
@@ -61,8 +61,7 @@ async def predict_income(
             confidence=confidence,
             category=category
         )
-        db.add(prediction)
-        db.commit()
+        await predictions.add(prediction)
         
         return PredictionResponse(
             prediction_id=prediction.prediction_id,
@@ -80,9 +79,6 @@ async def predict_income(
         )
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error predicting: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        db.close()
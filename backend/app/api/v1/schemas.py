@@ -39,6 +39,13 @@ class ClientList(BaseModel):
     total: int
     items: List[ClientInfo]
 
+# Максимум id в одном запросе POST /clients/batch
+CLIENT_BATCH_MAX_IDS = 1000
+
+class ClientBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=CLIENT_BATCH_MAX_IDS, description="ID клиентов")
+    fields: Optional[str] = Field(None, description="Колонки через запятую (по умолчанию - все поля клиента)")
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Prediction Schemas
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -109,6 +116,8 @@ class DashboardData(BaseModel):
     credit_decisions: CreditDecisions
     recent_predictions: List[PredictionResponse]
     top_features: List[ExplanationItem]
+    generation: int = 0  # Поколение данных (номер загрузки), из которого собран снимок
+    refreshed_at: Optional[str] = None
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Error Schemas
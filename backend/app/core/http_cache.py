@@ -0,0 +1,84 @@
+"""
+Условные GET по поколению данных клиентов (ETag / Last-Modified).
+
+Ответы /clients, /clients/{id} и /dashboard меняются только при загрузке
+клиентов, а каждая загрузка увеличивает номер поколения. Поэтому ETag - это
+номер поколения, и повторный запрос с If-None-Match получает 304 до запуска
+эндпоинта, без запросов к БД.
+"""
+
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import re
+
+from fastapi import HTTPException, Request, Response
+
+from app.api.v1.dependencies import get_current_user
+from app.services.dashboard_service import dataset_generation
+
+# path -> (нужна авторизация, Cache-Control)
+CONDITIONAL_PATHS = (
+    (re.compile(r"^/api/v1/clients(/(?!export$)[^/]+)?$"), False, "no-cache"),
+    (re.compile(r"^/api/v1/dashboard$"), True, "private, no-cache"),
+)
+
+def match_conditional_path(path: str):
+    for pattern, auth_required, cache_control in CONDITIONAL_PATHS:
+        if pattern.match(path):
+            return auth_required, cache_control
+    return None
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Слабое сравнение: W/"g5" совпадает с "g5" (nginx ослабляет ETag при gzip)
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+def not_modified_since(if_modified_since: str, refreshed_at) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # В HTTP-дате нет долей секунды
+    return refreshed_at.replace(microsecond=0) <= since
+
+async def is_authorized(request: Request) -> bool:
+    try:
+        await get_current_user(request.headers.get("authorization"))
+    except HTTPException:
+        return False
+    return True
+
+async def conditional_get_middleware(request: Request, call_next):
+    """304 по If-None-Match / If-Modified-Since; иначе - ETag и Last-Modified в ответе"""
+    if request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+    matched = match_conditional_path(request.url.path)
+    if matched is None:
+        return await call_next(request)
+    auth_required, cache_control = matched
+
+    generation, refreshed_at = await dataset_generation.current()
+    headers = {"ETag": f'"g{generation}"', "Cache-Control": cache_control}
+    if refreshed_at is not None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(refreshed_at, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, headers["ETag"])
+    else:
+        not_modified = (
+            if_modified_since is not None and refreshed_at is not None
+            and not_modified_since(if_modified_since, refreshed_at)
+        )
+    # Без авторизации 304 не отдаём: эндпоинт сам ответит 401
+    if not_modified and (not auth_required or await is_authorized(request)):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
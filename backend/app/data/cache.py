@@ -0,0 +1,251 @@
+"""
+Двухуровневый кеш: LRU в памяти процесса + Redis.
+
+Используется прежде всего для кеширования предсказаний модели: ключ -
+стабильный хеш (версия модели, вектор признаков), поэтому одинаковые строки
+из повторных загрузок не скорятся заново.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_PREFIX = "pred"
+MODEL_VERSION_KEY = "pred:model_version"
+
+# Сколько ключей отправлять в одной команде MGET/SET внутри pipeline
+REDIS_CHUNK_SIZE = 10000
+
+# Пауза перед повторной попыткой подключения к недоступному Redis
+REDIS_RETRY_SECONDS = 30
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кеш на OrderedDict"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        return found
+
+    def set_many(self, mapping: Dict[str, object]) -> None:
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheManager:
+    """
+    LRU в процессе + общий Redis.
+
+    Redis опционален: если он недоступен, кеш работает только в памяти
+    и периодически пытается переподключиться.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        lru_size: Optional[int] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.ttl = ttl or settings.CACHE_TTL_SECONDS
+        self.lru = LRUCache(lru_size or settings.CACHE_LRU_SIZE)
+        self._redis: Optional[redis.Redis] = None
+        self._redis_retry_at = 0.0
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Redis
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Клиент Redis или None, если Redis сейчас недоступен"""
+        if self._redis is not None or time.monotonic() < self._redis_retry_at:
+            return self._redis
+        try:
+            client = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            client.ping()
+            self._redis = client
+            logger.info("✓ Redis cache connected")
+        except redis.RedisError as e:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.warning(f"Redis недоступен, используется только локальный кеш: {e}")
+        return self._redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning(f"Ошибка Redis, переключаемся на локальный кеш: {error}")
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Общий key-value API (значения сериализуются в JSON)
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        """Ищет ключи в LRU, недостающие - одним MGET в Redis"""
+        found = self.lru.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        client = self.redis
+        if not missing or client is None:
+            return found
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for start in range(0, len(missing), REDIS_CHUNK_SIZE):
+                pipe.mget(missing[start:start + REDIS_CHUNK_SIZE])
+            values = [value for chunk in pipe.execute() for value in chunk]
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return found
+
+        from_redis = {key: json.loads(value) for key, value in zip(missing, values) if value is not None}
+        self.lru.set_many(from_redis)
+        found.update(from_redis)
+        return found
+
+    def set_many(self, mapping: Dict[str, object], ttl: Optional[int] = None) -> None:
+        """Записывает значения в оба уровня кеша"""
+        if not mapping:
+            return
+        self.lru.set_many(mapping)
+        client = self.redis
+        if client is None:
+            return
+
+        ttl = ttl or self.ttl
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, json.dumps(value), ex=ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def get(self, key: str) -> Optional[object]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: object, ttl: Optional[int] = None) -> None:
+        self.set_many({key: value}, ttl=ttl)
+
+    async def aget(self, key: str) -> Optional[object]:
+        """get для async-кода: попадание в LRU - сразу, поход в Redis - в потоке, не в event loop"""
+        found = self.lru.get_many([key])
+        if key in found:
+            return found[key]
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: object, ttl: Optional[int] = None) -> None:
+        """set для async-кода (запись в Redis - в потоке)"""
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Удаляет все ключи с префиксом из обоих уровней"""
+        self.lru.delete_prefix(prefix)
+        client = self.redis
+        if client is None:
+            return
+        try:
+            batch = []
+            for key in client.scan_iter(match=f"{prefix}*", count=REDIS_CHUNK_SIZE):
+                batch.append(key)
+                if len(batch) >= REDIS_CHUNK_SIZE:
+                    client.unlink(*batch)
+                    batch = []
+            if batch:
+                client.unlink(*batch)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Кеш предсказаний
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    @staticmethod
+    def prediction_keys(model_version: str, features: pd.DataFrame) -> List[str]:
+        """
+        Стабильные ключи для строк признаков.
+
+        Хеш строки считается векторно через hash_pandas_object (фиксированный
+        ключ хеширования, одинаковый во всех процессах), набор и порядок
+        колонок входит в префикс ключа.
+        """
+        columns_sig = hashlib.sha1(",".join(map(str, features.columns)).encode()).hexdigest()[:8]
+        row_hashes = pd.util.hash_pandas_object(features, index=False).to_numpy()
+        prefix = f"{PREDICTION_PREFIX}:{model_version}:{columns_sig}:"
+        return [f"{prefix}{h:016x}" for h in row_hashes.tolist()]
+
+    def ensure_model_version(self, model_version: str) -> None:
+        """Сбрасывает кеш предсказаний, если версия модели сменилась"""
+        with self._lock:
+            if self._model_version == model_version:
+                return
+
+            client = self.redis
+            previous = self._model_version
+            if client is not None:
+                try:
+                    stored = client.get(MODEL_VERSION_KEY)
+                    previous = stored.decode() if stored else previous
+                    client.set(MODEL_VERSION_KEY, model_version)
+                except redis.RedisError as e:
+                    self._redis_failed(e)
+
+            if previous and previous != model_version:
+                logger.info(f"Версия модели изменилась ({previous} -> {model_version}), сбрасываем кеш предсказаний")
+                self.delete_prefix(f"{PREDICTION_PREFIX}:{previous}:")
+            self.lru.delete_prefix(f"{PREDICTION_PREFIX}:")
+            self._model_version = model_version
+
+    def get_predictions(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (значения с NaN на месте промахов, булева маска попаданий)
+        """
+        found = self.get_many(keys)
+        values = np.array([found.get(key, np.nan) for key in keys], dtype=np.float64)
+        return values, ~np.isnan(values)
+
+    def set_predictions(self, keys: List[str], values: np.ndarray) -> None:
+        self.set_many(dict(zip(keys, np.asarray(values, dtype=np.float64).tolist())))
@@ -1,22 +1,73 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from pathlib import Path
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
-from app.data.models import Base
+from app.data.read_replicas import ReadReplicaRouter
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Engine creation
+# Async-драйверы для API: тот же DATABASE_URL, другой драйвер
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Общие настройки пула для обоих движков
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,  # Проверка соединения перед использованием
+)
+
+def async_database_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://... (драйвер в URL заменяется на async)"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(hide_password=False)
+
+# Sync engine - скрипты, миграции и фоновые задачи загрузки
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,  # Проверка соединения перед использованием
+    **POOL_OPTIONS
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine - эндпоинты API, не блокирует event loop на запросах к БД
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    echo=settings.DEBUG,
+    **POOL_OPTIONS
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Реплики для читающих эндпоинтов; запись всегда идёт через primary (async_engine)
+read_engines = [
+    create_async_engine(async_database_url(url.strip()), echo=settings.DEBUG, **POOL_OPTIONS)
+    for url in settings.DATABASE_READ_URL.split(",") if url.strip()
+]
+read_replicas = ReadReplicaRouter(read_engines, async_engine, retry_after=settings.DB_REPLICA_RETRY_SECONDS)
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """Сессия для чтения на реплике (или primary, если реплик нет)"""
+    async with read_replicas.connect() as conn:
+        async with AsyncSessionLocal(bind=conn) as session:
+            yield session
+
+async def get_read_db() -> AsyncIterator[AsyncSession]:
+    """Dependency для читающих эндпоинтов"""
+    async with read_session() as session:
+        yield session
+
 def get_db_session() -> Session:
     """Dependency для получения БД сессии"""
     db = SessionLocal()
@@ -25,117 +76,59 @@ def get_db_session() -> Session:
     finally:
         db.close()
 
-async def init_db():
-    """Инициализация БД (создание таблиц)"""
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency для получения async БД сессии (эндпоинты API)"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+class SchemaVersionError(RuntimeError):
+    """Схема БД не совпадает с последней миграцией"""
+
+# Миграции выполняются отдельным шагом: alembic upgrade head (из каталога backend)
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def schema_head_revision() -> str:
+    """Последняя ревизия миграций (читается из файлов, без обращения к БД)"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    
+    return ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_current_head()
+
+async def check_schema_version():
+    """
+    Проверка версии схемы БД при старте.
+    
+    Один запрос к alembic_version вместо интроспекции и ALTER TABLE на каждом
+    запуске; сами миграции сюда не входят.
+    
+    Raises:
+        SchemaVersionError: если БД не мигрирована до последней ревизии
+    """
+    head = schema_head_revision()
     try:
-        logger.info("Initializing database...")
-        
-        # Создаем все таблицы
-        Base.metadata.create_all(bind=engine)
-        
-        logger.info("✓ Database tables created/verified")
-        
-        # Миграция таблицы clients: добавляем недостающие колонки
-        with engine.begin() as conn:
-            # Список необходимых колонок (incomeValue с кавычками для сохранения регистра)
-            required_columns = {
-                'id': 'VARCHAR(50)',
-                'target': 'FLOAT',
-                '"incomeValue"': 'FLOAT',  # С кавычками для сохранения camelCase
-                'avg_cur_cr_turn': 'FLOAT',
-                'ovrd_sum': 'FLOAT DEFAULT 0',
-                'loan_cur_amt': 'FLOAT DEFAULT 0',
-                'hdb_income_ratio': 'FLOAT',
-                'created_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
-            }
-            
-            # Проверяем существующие колонки (учитываем регистр)
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'clients'
-            """))
-            existing_columns = {row[0] for row in result.fetchall()}
-            existing_columns_lower = {col.lower(): col for col in existing_columns}
-            
-            logger.info(f"Существующие колонки в clients: {existing_columns}")
-            
-            # Переименовываем client_id в id если нужно
-            if 'client_id' in existing_columns and 'id' not in existing_columns:
-                logger.info("Migrating: renaming client_id to id...")
-                conn.execute(text("ALTER TABLE clients RENAME COLUMN client_id TO id"))
-                logger.info("✓ Migration completed: client_id -> id")
-                existing_columns.remove('client_id')
-                existing_columns.add('id')
-                # Обновляем словарь для проверки в нижнем регистре
-                existing_columns_lower = {col.lower(): col for col in existing_columns}
-            
-            # Переименовываем incomevalue в "incomeValue" если нужно
-            incomevalue_original = existing_columns_lower.get('incomevalue')
-            if incomevalue_original and 'incomeValue' not in existing_columns:
-                logger.info(f"Migrating: renaming {incomevalue_original} to incomeValue...")
-                conn.execute(text(f'ALTER TABLE clients RENAME COLUMN "{incomevalue_original}" TO "incomeValue"'))
-                logger.info("✓ Migration completed: incomevalue -> incomeValue")
-                # Обновляем множества после переименования
-                existing_columns.discard(incomevalue_original)  # Используем discard вместо remove
-                existing_columns.add('incomeValue')
-                # Обновляем словарь для проверки в нижнем регистре
-                existing_columns_lower = {col.lower(): col for col in existing_columns}
-            
-            # Добавляем недостающие колонки
-            for col_name, col_def in required_columns.items():
-                # Проверяем как в нижнем регистре, так и с кавычками
-                col_name_check = col_name.strip('"').lower()
-                if col_name_check not in existing_columns_lower and col_name not in existing_columns:
-                    logger.info(f"Adding column {col_name}...")
-                    try:
-                        conn.execute(text(f"ALTER TABLE clients ADD COLUMN {col_name} {col_def}"))
-                        logger.info(f"✓ Column {col_name} added")
-                    except Exception as e:
-                        logger.warning(f"Could not add column {col_name}: {e}")
-            
-            # Удаляем неиспользуемые колонки
-            columns_to_drop = ['adminarea', 'city_smart_name']
-            for col_name in columns_to_drop:
-                if col_name in existing_columns:
-                    logger.info(f"Dropping column {col_name}...")
-                    try:
-                        conn.execute(text(f"ALTER TABLE clients DROP COLUMN IF EXISTS {col_name}"))
-                        logger.info(f"✓ Column {col_name} dropped")
-                    except Exception as e:
-                        logger.warning(f"Could not drop column {col_name}: {e}")
-        
-        # Проверяем что таблицы созданы
-        with engine.connect() as conn:
-            result = conn.execute(text(
-                "SELECT table_name FROM information_schema.tables WHERE table_schema='public'"
-            ))
-            tables = result.fetchall()
-            logger.info(f"✓ Tables in database: {[t[0] for t in tables]}")
-            
-            # Проверяем финальную структуру clients
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'clients'
-                ORDER BY ordinal_position
-            """))
-            final_columns = [row[0] for row in result.fetchall()]
-            logger.info(f"✓ Final clients table columns: {final_columns}")
-        
-        # Не загружаем клиентов автоматически - они будут загружены через endpoint загрузки CSV
-        logger.info("✓ Database initialized. Clients will be loaded via CSV upload endpoint.")
+        async with async_engine.connect() as conn:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+    except DBAPIError:
+        current = None
     
-    except Exception as e:
-        logger.error(f"❌ Database initialization error: {e}")
-        raise
+    if current != head:
+        logger.error(f"❌ Schema version {current} != {head}. Run: alembic upgrade head")
+        raise SchemaVersionError(f"Схема БД в версии {current}, требуется {head}: выполните alembic upgrade head")
+    
+    logger.info(f"✓ Database schema version: {current}")
 
 async def test_db_connection():
     """Тест подключения к БД"""
     try:
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         logger.info("✓ Database connection successful")
+        # Недоступная реплика не мешает старту - чтение уйдёт на другие или на primary
+        for replica in await read_replicas.check():
+            if replica["status"] != "ok":
+                logger.warning(f"⚠ Read replica {replica['url']} unavailable: {replica['error']}")
         return True
     except Exception as e:
         logger.error(f"❌ Database connection failed: {e}")
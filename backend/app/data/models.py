@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Integer, ForeignKey, Date, Boolean
+from sqlalchemy import Column, String, Float, DateTime, Integer, ForeignKey, Date, Boolean, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -36,8 +36,28 @@ class Client(Base):
     loan_cur_amt = Column("loan_cur_amt", Float, nullable=True, default=0.0)
     hdb_income_ratio = Column("hdb_income_ratio", Float, nullable=True)
     PDN = Column("PDN", Float, nullable=True)  # Новое поле: Показатель долговой нагрузки
+    # Решение по кредиту - считается при загрузке (credit_service), фильтруется в SQL
+    debt_burden_ratio = Column(Float, nullable=True)
+    risk_level = Column(String(10), nullable=True, index=True)  # LOW/MEDIUM/HIGH
+    recommendation = Column(String(10), nullable=True, index=True)  # APPROVE/REVIEW/REJECT
+    credit_eligible = Column(Boolean, nullable=True, index=True)
+    reasoning = Column(String(255), nullable=True)
+    row_hash = Column(String(16), nullable=True)  # Хеш содержимого строки (для upsert)
+    feature_hash = Column(String(16), nullable=True)  # Хеш признаков модели и её версии
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Индексы (col, id) под сортировки списка клиентов и keyset-пагинацию;
+    # они же обслуживают диапазонные фильтры по incomeValue / PDN / ovrd_sum
+    __table_args__ = tuple(
+        Index(f"ix_clients_{name}_id", name, "id")
+        for name in ("incomeValue", "target", "ovrd_sum", "loan_cur_amt", "hdb_income_ratio", "PDN", "debt_burden_ratio")
+    ) + (
+        # Поиск по части id (только PostgreSQL): LIKE 'abc%' - text_pattern_ops,
+        # LIKE '%abc%' - триграммный GIN (расширение pg_trgm)
+        Index("ix_clients_id_pattern", "id", postgresql_ops={"id": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_clients_id_trgm", "id", postgresql_using="gin", postgresql_ops={"id": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
+    
     def __repr__(self):
         return f"<Client(id={self.id}, incomeValue={self.incomeValue}, PDN={self.PDN})>"
 
@@ -89,3 +109,17 @@ class ModelMetrics(Base):
     
     def __repr__(self):
         return f"<ModelMetrics(name={self.metric_name}, value={self.metric_value})>"
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# DASHBOARD SNAPSHOT
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class DashboardSnapshot(Base):
+    __tablename__ = "dashboard_snapshot"
+    
+    generation = Column(Integer, primary_key=True, autoincrement=False)  # Поколение данных: +1 на каждую загрузку клиентов
+    data = Column(JSON, nullable=False)  # Агрегаты клиентов для dashboard
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<DashboardSnapshot(generation={self.generation}, refreshed_at={self.refreshed_at})>"
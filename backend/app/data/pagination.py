@@ -0,0 +1,113 @@
+"""
+Keyset-пагинация по индексам (col, id).
+
+Вместо OFFSET страница продолжается с последней выданной строки: условие
+(col, id) > (last_col, last_id) идёт прямо по индексу, поэтому любая
+страница стоит столько же, сколько первая.
+
+NULL в колонке сортировки упорядочиваются как в PostgreSQL по умолчанию
+(ASC NULLS LAST, DESC NULLS FIRST) - так индекс (col, id) читается в обе
+стороны без сортировки. Строки с NULL и без выбираются отдельными
+диапазонами по тому же индексу.
+"""
+
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Участки выборки: строки с непустой колонкой сортировки и с NULL
+SEGMENT_VALUES = "v"
+SEGMENT_NULLS = "n"
+
+class InvalidCursorError(ValueError):
+    """Курсор повреждён или выдан для другой сортировки / фильтра"""
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+    if not isinstance(payload, dict):
+        raise InvalidCursorError("Некорректный курсор")
+    return payload
+
+def _segments(descending: bool) -> Tuple[str, str]:
+    return (SEGMENT_NULLS, SEGMENT_VALUES) if descending else (SEGMENT_VALUES, SEGMENT_NULLS)
+
+def _segment_query(stmt: Select, column, id_column, descending: bool, segment: str, position: Optional[dict]) -> Select:
+    if segment == SEGMENT_VALUES:
+        stmt = stmt.where(column.is_not(None))
+        if position is not None:
+            key = (position["v"], position["id"])
+            stmt = stmt.where(tuple_(column, id_column) < key if descending else tuple_(column, id_column) > key)
+        return stmt.order_by(column.desc(), id_column.desc()) if descending else stmt.order_by(column, id_column)
+
+    stmt = stmt.where(column.is_(None))
+    if position is not None:
+        stmt = stmt.where(id_column < position["id"] if descending else id_column > position["id"])
+    return stmt.order_by(id_column.desc()) if descending else stmt.order_by(id_column)
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    column,
+    id_column,
+    descending: bool,
+    limit: int,
+    cursor: Optional[dict] = None,
+) -> Tuple[List[Any], Optional[dict]]:
+    """
+    Одна страница keyset-пагинации.
+
+    Args:
+        db: Сессия БД
+        stmt: select(колонки) с уже применёнными фильтрами (без сортировки);
+            колонка сортировки и id должны входить в проекцию
+        column: Колонка сортировки
+        id_column: Уникальная колонка для разрешения равных значений
+        descending: Сортировка по убыванию
+        limit: Размер страницы
+        cursor: Позиция из decode_cursor (None - первая страница)
+
+    Returns:
+        (строки страницы, позиция для следующей страницы или None, если строк больше нет)
+    """
+    segments = _segments(descending)
+    start = 0
+    position = None
+    if cursor is not None:
+        if cursor.get("seg") not in segments or "id" not in cursor or (cursor["seg"] == SEGMENT_VALUES and "v" not in cursor):
+            raise InvalidCursorError("Некорректный курсор")
+        start = segments.index(cursor["seg"])
+        position = cursor
+
+    rows: List[Any] = []
+    for segment in segments[start:]:
+        # Берём на одну строку больше, чтобы знать, есть ли продолжение
+        segment_stmt = _segment_query(stmt, column, id_column, descending, segment, position).limit(limit + 1 - len(rows))
+        batch = (await db.execute(segment_stmt)).all()
+        rows.extend(batch)
+        position = None
+        if len(rows) > limit:
+            break
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    value = getattr(last, column.key)
+    next_position = {
+        "seg": SEGMENT_NULLS if value is None else SEGMENT_VALUES,
+        "v": value,
+        "id": getattr(last, id_column.key),
+    }
+    return rows, next_position
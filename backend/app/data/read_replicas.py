@@ -0,0 +1,79 @@
+"""
+Маршрутизация чтения по репликам БД.
+
+Читающие эндпоинты получают соединение с реплики по кругу (round-robin).
+Реплика, к которой не удалось подключиться, исключается из ротации на
+retry_after секунд; если доступных реплик нет, чтение идёт на primary.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+import itertools
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+class ReadReplicaRouter:
+    """Выбор движка для чтения: реплики по кругу, при отказе - следующая, в конце - primary"""
+
+    def __init__(self, replicas: List[AsyncEngine], primary: AsyncEngine, retry_after: float = 30.0):
+        self.replicas = replicas
+        self.primary = primary
+        self.retry_after = retry_after
+        self._turn = itertools.count()
+        # Индекс реплики -> момент (time.monotonic), до которого она исключена
+        self._down_until: Dict[int, float] = {}
+
+    def _is_up(self, index: int) -> bool:
+        return self._down_until.get(index, 0.0) <= time.monotonic()
+
+    def mark_down(self, index: int) -> None:
+        self._down_until[index] = time.monotonic() + self.retry_after
+
+    def mark_up(self, index: int) -> None:
+        self._down_until.pop(index, None)
+
+    def candidates(self) -> List[AsyncEngine]:
+        """Порядок попыток для одного запроса: доступные реплики начиная с очередной, затем primary"""
+        if not self.replicas:
+            return [self.primary]
+        start = next(self._turn) % len(self.replicas)
+        order = [(start + shift) % len(self.replicas) for shift in range(len(self.replicas))]
+        return [self.replicas[index] for index in order if self._is_up(index)] + [self.primary]
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[AsyncConnection]:
+        """Соединение для чтения с первой ответившей реплики (или primary)"""
+        for engine in self.candidates():
+            try:
+                conn = await engine.connect()
+            except (DBAPIError, OSError) as e:
+                if engine is self.primary:
+                    raise
+                self.mark_down(self.replicas.index(engine))
+                logger.warning(f"⚠ Read replica {engine.url.render_as_string()} unavailable: {e}")
+                continue
+            try:
+                yield conn
+            finally:
+                await conn.close()
+            return
+
+    async def check(self) -> List[dict]:
+        """Проверка всех реплик (SELECT 1) с обновлением их статуса"""
+        status = []
+        for index, engine in enumerate(self.replicas):
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                self.mark_up(index)
+                status.append({"url": engine.url.render_as_string(), "status": "ok"})
+            except (DBAPIError, OSError) as e:
+                self.mark_down(index)
+                status.append({"url": engine.url.render_as_string(), "status": "down", "error": str(e)})
+        return status
@@ -0,0 +1,100 @@
+"""
+Базовый репозиторий: чтение моделей без гидрации ORM-объектов.
+
+Запросы выбирают только нужные колонки (fields=) и возвращают Row - лёгкие
+именованные кортежи SQLAlchemy с доступом по атрибуту (row.id) и по
+словарю (row._mapping).
+"""
+
+from typing import Any, AsyncIterator, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import ARRAY, Row, Select, any_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Строк на одну выборку из курсора при потоковом чтении
+STREAM_BATCH_SIZE = 1000
+
+def with_required(fields: Sequence[str], *required: str) -> Tuple[str, ...]:
+    """Колонки проекции плюс недостающие служебные - в конце, чтобы их можно было отбросить zip'ом"""
+    fields = tuple(fields)
+    return fields + tuple(name for name in required if name not in fields)
+
+class BaseRepository:
+    """Чтение одной модели; наследники задают model и default_fields"""
+
+    model = None
+    default_fields: Sequence[str] = ()
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def dialect(self) -> str:
+        return self.db.bind.dialect.name
+
+    @classmethod
+    def columns(cls, fields: Optional[Sequence[str]] = None) -> List[Any]:
+        """
+        Колонки модели для проекции.
+
+        Raises:
+            ValueError: если среди fields есть неизвестное поле
+        """
+        table_columns = cls.model.__table__.c
+        fields = fields or cls.default_fields or table_columns.keys()
+        unknown = [name for name in fields if name not in table_columns]
+        if unknown:
+            raise ValueError(f"Неизвестные поля: {unknown}")
+        return [getattr(cls.model, name) for name in fields]
+
+    def select(self, fields: Optional[Sequence[str]] = None) -> Select:
+        return select(*self.columns(fields))
+
+    def _primary_key(self):
+        return self.model.__table__.primary_key.columns.values()[0]
+
+    def ids_filter(self, ids: Sequence[Any]):
+        """
+        Условие "id из списка".
+
+        На PostgreSQL - один параметр-массив (id = ANY(:ids)): текст запроса
+        не зависит от числа id и кешируется, на остальных БД - IN (...).
+        """
+        pk = self._primary_key()
+        if self.dialect == "postgresql":
+            return pk == any_(bindparam("ids", list(ids), type_=ARRAY(pk.type)))
+        return pk.in_(list(ids))
+
+    async def get(self, id: Any, fields: Optional[Sequence[str]] = None) -> Optional[Row]:
+        result = await self.db.execute(self.select(fields).where(self._primary_key() == id))
+        return result.first()
+
+    async def get_many(self, ids: Iterable[Any], fields: Optional[Sequence[str]] = None) -> List[Row]:
+        """Строки для списка id одним запросом (порядок не гарантируется)"""
+        ids = list(ids)
+        if not ids:
+            return []
+        result = await self.db.execute(self.select(fields).where(self.ids_filter(ids)))
+        return result.all()
+
+    async def stream(
+        self,
+        stmt: Optional[Select] = None,
+        fields: Optional[Sequence[str]] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Row]:
+        """
+        Потоковое чтение большой выборки пачками по batch_size (yield_per).
+
+        Весь результат в памяти не держится - строки отдаются по мере чтения курсора.
+        """
+        stmt = stmt if stmt is not None else self.select(fields)
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+    async def stream_partitions(self, stmt: Select, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[List[Row]]:
+        """Как stream, но строки отдаются пачками по batch_size"""
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions(batch_size):
+            yield partition
@@ -0,0 +1,238 @@
+"""
+Репозиторий клиентов: страницы списка, подсчёт и потоковое чтение.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, Row, Select, case, cast, func, literal, select, text
+from sqlalchemy.dialects.postgresql import array
+
+from app.data.models import Client
+from app.data.pagination import keyset_page
+from app.data.repositories.base_repository import BaseRepository, with_required
+
+# Поля клиента в ответах API
+CLIENT_API_FIELDS = (
+    "id", "target", "incomeValue", "avg_cur_cr_turn", "ovrd_sum", "loan_cur_amt",
+    "hdb_income_ratio", "PDN", "risk_level", "recommendation", "reasoning",
+)
+
+# Поля, которые можно запросить через fields= (служебные хеши строк - нельзя)
+CLIENT_SELECTABLE_FIELDS = CLIENT_API_FIELDS + ("created_at",)
+
+# Поля, по которым разрешена сортировка списка
+SORT_FIELDS = ("incomeValue", "target", "ovrd_sum", "loan_cur_amt", "hdb_income_ratio", "PDN", "debt_burden_ratio")
+
+# Поля с диапазонными фильтрами списка: <поле>_min / <поле>_max (индексы (col, id))
+RANGE_FILTER_FIELDS = ("incomeValue", "PDN", "ovrd_sum")
+
+# Режимы поиска по id: prefix - LIKE 'q%', contains - LIKE '%q%'
+SEARCH_MODES = ("prefix", "contains")
+
+# Фильтры списка: risk_level, search + search_mode, <поле>_min / <поле>_max
+ClientFilters = Dict[str, Any]
+
+# Числовые поля, для которых строится распределение
+DISTRIBUTION_FIELDS = (
+    "incomeValue", "target", "avg_cur_cr_turn", "ovrd_sum", "loan_cur_amt",
+    "hdb_income_ratio", "PDN", "debt_burden_ratio",
+)
+
+# Категории дохода для dashboard: (категория, верхняя граница incomeValue)
+INCOME_CATEGORIES = (("LOW", 100000), ("MIDDLE", 200000), ("HIGH", None))
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def dashboard_aggregates_query() -> Select:
+    """
+    Все агрегаты dashboard одним проходом по clients.
+
+    Решения по кредиту берутся из сохранённых колонок, категории дохода -
+    условными суммами (CASE), поэтому возвращается одна строка агрегатов.
+    """
+    columns = [
+        func.count().label("total_clients"),
+        func.avg(Client.incomeValue).label("avg_income"),
+        _count_where(Client.recommendation == "APPROVE").label("approved"),
+        _count_where(Client.recommendation == "REJECT").label("rejected"),
+        _count_where(Client.recommendation == "REVIEW").label("review"),
+        _count_where(Client.incomeValue.is_(None)).label("income_UNKNOWN"),
+    ]
+    lower = None
+    for category, upper in INCOME_CATEGORIES:
+        condition = Client.incomeValue.is_not(None)
+        if lower is not None:
+            condition = condition & (Client.incomeValue >= lower)
+        if upper is not None:
+            condition = condition & (Client.incomeValue < upper)
+        columns.append(_count_where(condition).label(f"income_{category}"))
+        lower = upper
+    return select(*columns).select_from(Client)
+
+class ClientRepository(BaseRepository):
+    model = Client
+    default_fields = CLIENT_API_FIELDS
+
+    def filtered(self, fields: Optional[Sequence[str]] = None, filters: Optional[ClientFilters] = None) -> Select:
+        """
+        Выборка клиентов с фильтрами списка.
+
+        Поиск по id использует индексы ix_clients_id_pattern (префикс) и
+        ix_clients_id_trgm (подстрока, от 3 символов); диапазоны - индексы
+        (col, id), по которым сортируется список.
+        """
+        stmt = self.select(fields)
+        filters = filters or {}
+        if filters.get("risk_level"):
+            stmt = stmt.where(Client.risk_level == filters["risk_level"])
+        if filters.get("search"):
+            # Шаблон собирается целиком, чтобы планировщик видел в параметре готовый префикс
+            pattern = _escape_like(filters["search"]) + "%"
+            if filters.get("search_mode", "contains") == "contains":
+                pattern = "%" + pattern
+            stmt = stmt.where(Client.id.like(pattern, escape="\\"))
+        for name in RANGE_FILTER_FIELDS:
+            column = getattr(Client, name)
+            if filters.get(f"{name}_min") is not None:
+                stmt = stmt.where(column >= filters[f"{name}_min"])
+            if filters.get(f"{name}_max") is not None:
+                stmt = stmt.where(column <= filters[f"{name}_max"])
+        return stmt
+
+    async def page(
+        self,
+        sort: str,
+        descending: bool,
+        limit: int,
+        cursor: Optional[dict] = None,
+        filters: Optional[ClientFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Row], Optional[dict]]:
+        """Keyset-страница списка (см. app.data.pagination.keyset_page)"""
+        # Колонка сортировки и id нужны в строке для позиции следующей страницы
+        stmt = self.filtered(with_required(fields or CLIENT_API_FIELDS, "id", sort), filters)
+        return await keyset_page(self.db, stmt, getattr(Client, sort), Client.id, descending, limit, cursor)
+
+    async def page_by_offset(
+        self,
+        sort: str,
+        descending: bool,
+        limit: int,
+        offset: int,
+        filters: Optional[ClientFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Row]:
+        """Страница по OFFSET - тот же порядок, что у keyset-страниц"""
+        stmt = self.ordered(sort, descending, filters, fields).offset(offset).limit(limit)
+        return (await self.db.execute(stmt)).all()
+
+    def ordered(
+        self,
+        sort: str,
+        descending: bool,
+        filters: Optional[ClientFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Select:
+        """Отфильтрованная выборка в порядке keyset-страниц (NULL как в PostgreSQL, равные - по id)"""
+        column = getattr(Client, sort)
+        ordering = (
+            (column.desc().nulls_first(), Client.id.desc()) if descending
+            else (column.asc().nulls_last(), Client.id.asc())
+        )
+        return self.filtered(fields, filters).order_by(*ordering)
+
+    def _distribution_value(self, field: str, log_scale: bool):
+        """Значение для гистограммы: log - ln(x), строки с x <= 0 исключаются"""
+        column = getattr(Client, field)
+        return (func.ln(column), column > 0) if log_scale else (column, column.is_not(None))
+
+    async def distribution_stats(
+        self,
+        field: str,
+        log_scale: bool = False,
+        quantiles: Sequence[float] = (),
+        group_by: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        Сводка распределения: total, nulls, excluded, lo/hi (в шкале гистограммы)
+        и quantiles - percentile_cont по исходным значениям (только PostgreSQL,
+        на других БД - None). С group_by - строка на группу, первая колонка - группа.
+        """
+        column = getattr(Client, field)
+        value, included = self._distribution_value(field, log_scale)
+        columns = [
+            func.count().label("total"),
+            _count_where(column.is_(None)).label("nulls"),
+            _count_where(column.is_not(None) & ~included).label("excluded"),
+            func.min(case((included, value))).label("lo"),
+            func.max(case((included, value))).label("hi"),
+        ]
+        if quantiles and self.dialect == "postgresql":
+            columns.append(
+                func.percentile_cont(array(quantiles)).within_group(column).filter(included).label("quantiles")
+            )
+        else:
+            columns.append(literal(None).label("quantiles"))
+        stmt = select(*columns).select_from(Client)
+        if group_by:
+            group = getattr(Client, group_by)
+            stmt = select(group, *columns).group_by(group).order_by(group)
+        return (await self.db.execute(stmt)).all()
+
+    async def histogram(
+        self,
+        field: str,
+        lo: float,
+        hi: float,
+        bins: int,
+        log_scale: bool = False,
+        group_by: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        Число клиентов по корзинам [lo, hi] равной ширины: строки (группа?, корзина 1..bins, count).
+
+        На PostgreSQL корзина считается width_bucket, на других БД - той же арифметикой.
+        Значение hi попадает в последнюю корзину.
+        """
+        value, included = self._distribution_value(field, log_scale)
+        if hi <= lo:
+            bucket = literal(1)
+        elif self.dialect == "postgresql":
+            bucket = func.least(func.width_bucket(value, lo, hi, bins), bins)
+        else:
+            bucket = case(
+                (value >= hi, bins),
+                else_=cast((value - lo) / ((hi - lo) / bins), Integer) + 1
+            )
+        keys = [getattr(Client, group_by), bucket.label("bucket")] if group_by else [bucket.label("bucket")]
+        # Корзина считается в подзапросе, чтобы GROUP BY ссылался на колонку, а не повторял выражение
+        buckets = select(*keys).where(included).subquery()
+        stmt = select(*buckets.c, func.count().label("count")).group_by(*buckets.c)
+        return (await self.db.execute(stmt)).all()
+
+    async def count(self, filters: Optional[ClientFilters] = None) -> int:
+        stmt = self.filtered(("id",), filters).with_only_columns(func.count(), maintain_column_froms=True)
+        return (await self.db.execute(stmt)).scalar()
+
+    async def dashboard_aggregates(self) -> Row:
+        return (await self.db.execute(dashboard_aggregates_query())).one()
+
+    async def estimated_count(self) -> Optional[int]:
+        """
+        Оценка числа строк из pg_class.reltuples (только PostgreSQL).
+
+        None - другая БД или таблица ещё не анализировалась.
+        """
+        if self.dialect != "postgresql":
+            return None
+        estimate = (await self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": Client.__tablename__}
+        )).scalar()
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
@@ -0,0 +1,23 @@
+"""
+Репозиторий снимков dashboard.
+"""
+
+from typing import Optional
+
+from sqlalchemy import Row
+
+from app.data.models import DashboardSnapshot
+from app.data.repositories.base_repository import BaseRepository
+
+class DashboardSnapshotRepository(BaseRepository):
+    model = DashboardSnapshot
+
+    async def latest(self) -> Optional[Row]:
+        """Снимок последнего поколения данных (None - загрузок ещё не было)"""
+        stmt = self.select().order_by(DashboardSnapshot.generation.desc()).limit(1)
+        return (await self.db.execute(stmt)).first()
+
+    async def latest_generation(self) -> Optional[Row]:
+        """(generation, refreshed_at) последнего снимка без данных - для ETag"""
+        stmt = self.select(("generation", "refreshed_at")).order_by(DashboardSnapshot.generation.desc()).limit(1)
+        return (await self.db.execute(stmt)).first()
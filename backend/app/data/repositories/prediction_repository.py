@@ -0,0 +1,28 @@
+"""
+Репозиторий прогнозов.
+"""
+
+from typing import Optional, Sequence
+
+from sqlalchemy import Row
+
+from app.data.models import Prediction
+from app.data.repositories.base_repository import BaseRepository
+
+class PredictionRepository(BaseRepository):
+    model = Prediction
+
+    async def latest_for_client(self, client_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Row]:
+        """Последний прогноз клиента"""
+        stmt = (
+            self.select(fields)
+            .where(Prediction.client_id == client_id)
+            .order_by(Prediction.created_at.desc())
+            .limit(1)
+        )
+        return (await self.db.execute(stmt)).first()
+
+    async def add(self, prediction: Prediction) -> Prediction:
+        self.db.add(prediction)
+        await self.db.commit()
+        return prediction
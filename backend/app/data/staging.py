@@ -0,0 +1,136 @@
+"""
+Полная перезагрузка таблицы через staging-таблицу (PostgreSQL).
+
+Новые данные заливаются в UNLOGGED копию таблицы, индексы строятся там же,
+а живая таблица подменяется переименованием в одной короткой транзакции.
+Читатели до подмены видят старые данные целиком, после - новые целиком;
+DELETE по живой таблице (и раздувание heap) не нужен.
+"""
+
+from typing import List, Tuple
+import re
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+STAGING_SUFFIX = "_staging"
+OLD_SUFFIX = "_old"
+
+# Сколько ждать блокировку живой таблицы при подмене
+SWAP_LOCK_TIMEOUT = "5s"
+
+def staging_name(table: str) -> str:
+    return f"{table}{STAGING_SUFFIX}"
+
+def create_staging_table(conn: Connection, table: str) -> str:
+    """
+    Создаёт пустую UNLOGGED копию таблицы без индексов.
+
+    Индексы строятся после заливки данных (build_staging_indexes) - так быстрее,
+    чем обновлять их на каждую строку COPY.
+    """
+    staging = staging_name(table)
+    conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    conn.execute(text(
+        f"CREATE UNLOGGED TABLE {staging} "
+        f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+    ))
+    logger.info(f"Создана staging-таблица {staging}")
+    return staging
+
+def drop_staging_table(engine: Engine, table: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging_name(table)}"))
+
+def _table_indexes(conn: Connection, table: str) -> List[Tuple[str, str]]:
+    rows = conn.execute(text("""
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = :table
+    """), {"table": table})
+    return [(row[0], row[1]) for row in rows]
+
+def _primary_key_name(conn: Connection, table: str):
+    return conn.execute(text("""
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = CAST(:table AS regclass) AND contype = 'p'
+    """), {"table": table}).scalar()
+
+def _referencing_foreign_keys(conn: Connection, table: str) -> List[Tuple[str, str, str]]:
+    """Внешние ключи других таблиц на table: (таблица, имя, определение)"""
+    rows = conn.execute(text("""
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE confrelid = CAST(:table AS regclass) AND contype = 'f'
+    """), {"table": table})
+    return [(row[0], row[1], row[2]) for row in rows]
+
+def build_staging_indexes(conn: Connection, table: str) -> List[str]:
+    """
+    Повторяет на staging-таблице все индексы живой таблицы (включая первичный ключ).
+
+    Индексы получают суффикс _staging; после подмены им возвращаются исходные имена.
+
+    Returns:
+        Исходные имена индексов
+    """
+    staging = staging_name(table)
+    preparer = conn.dialect.identifier_preparer
+    pk_name = _primary_key_name(conn, table)
+    index_names = []
+
+    for index_name, index_def in _table_indexes(conn, table):
+        new_name = preparer.quote(f"{index_name}{STAGING_SUFFIX}")
+        staging_def = re.sub(
+            r"INDEX \S+ ON (ONLY )?(\S+\.)?\S+ ",
+            lambda m: f"INDEX {new_name} ON {staging} ",
+            index_def,
+            count=1
+        )
+        conn.execute(text(staging_def))
+        if index_name == pk_name:
+            conn.execute(text(f"ALTER TABLE {staging} ADD CONSTRAINT {new_name} PRIMARY KEY USING INDEX {new_name}"))
+        index_names.append(index_name)
+
+    logger.info(f"Построено индексов на {staging}: {len(index_names)}")
+    return index_names
+
+def swap_staging_table(engine: Engine, table: str) -> None:
+    """
+    Строит индексы на staging-таблице и подменяет ею живую таблицу.
+
+    Долгие операции (индексы, SET LOGGED) выполняются до подмены; сама подмена -
+    переименования и DROP старой таблицы - одна короткая транзакция.
+    Внешние ключи других таблиц пересоздаются как NOT VALID: существующие строки
+    не перепроверяются, новые проверяются как обычно.
+    """
+    staging = staging_name(table)
+    old = f"{table}{OLD_SUFFIX}"
+    preparer = engine.dialect.identifier_preparer
+
+    with engine.begin() as conn:
+        index_names = build_staging_indexes(conn, table)
+        conn.execute(text(f"ALTER TABLE {staging} SET LOGGED"))
+        conn.execute(text(f"ANALYZE {staging}"))
+
+    with engine.begin() as conn:
+        conn.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+        conn.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        foreign_keys = _referencing_foreign_keys(conn, table)
+
+        conn.execute(text(f"DROP TABLE IF EXISTS {old}"))
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+        conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table}"))
+        # CASCADE снимает внешние ключи, указывающие на старую таблицу
+        conn.execute(text(f"DROP TABLE {old} CASCADE"))
+
+        for index_name in index_names:
+            conn.execute(text(
+                f"ALTER INDEX {preparer.quote(index_name + STAGING_SUFFIX)} RENAME TO {preparer.quote(index_name)}"
+            ))
+        for fk_table, fk_name, fk_def in foreign_keys:
+            conn.execute(text(f"ALTER TABLE {fk_table} ADD CONSTRAINT {preparer.quote(fk_name)} {fk_def} NOT VALID"))
+
+    logger.info(f"✓ Таблица {table} подменена staging-копией")
@@ -1,12 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings, ALLOWED_ORIGINS
 from app.core.logging_config import setup_logging
+from app.core.http_cache import conditional_get_middleware
 from app.api.v1.endpoints import health, auth, clients, predictions, dashboard
-from app.data.database import init_db, test_db_connection
+from app.data.database import check_schema_version, test_db_connection, async_engine, read_engines
+from app.api.v1.dependencies import init_dependencies
+from app.services.upload_job_service import upload_jobs
+from app.services.warmup_service import cache_warmer
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -23,9 +28,18 @@ async def lifespan(app: FastAPI):
         logger.info("📊 Testing database connection...")
         await test_db_connection()
         
-        # 2. Initialize database
-        logger.info("📊 Initializing database...")
-        await init_db()
+        # 2. Check schema version (migrations run separately: alembic upgrade head)
+        logger.info("📊 Checking database schema version...")
+        await check_schema_version()
+        
+        # 3. ML model loader + prediction cache
+        logger.info("🧠 Initializing ML dependencies...")
+        init_dependencies()
+        
+        # 4. Warm-up: dashboard + first list pages (bounded by WARMUP_TIME_BUDGET_SECONDS)
+        logger.info("🔥 Warming up caches...")
+        cache_warmer.attach(app)
+        await cache_warmer.run("startup")
         
         logger.info("="*60)
         logger.info("✅ APPLICATION STARTED SUCCESSFULLY!")
@@ -43,14 +57,22 @@ async def lifespan(app: FastAPI):
     
     # SHUTDOWN
     logger.info("🛑 Shutting down application...")
+    upload_jobs.shutdown()
+    await async_engine.dispose()
+    for read_engine in read_engines:
+        await read_engine.dispose()
 
 app = FastAPI(
     title="Alfa-Bank Income Prediction API",
     description="API для прогноза доходов клиентов",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# ETag / 304 для чтения клиентов и dashboard (до CORS, чтобы 304 тоже получал CORS-заголовки)
+app.middleware("http")(conditional_get_middleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,118 @@
+"""
+Загрузка XGBoost модели.
+
+Модель читается с диска один раз на процесс, а её версия вычисляется
+как хеш содержимого model.json - по ней инвалидируется кеш предсказаний.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import threading
+import logging
+
+import xgboost as xgb
+
+from app.core.config import settings
+from app.ml.predictor import CompiledForest, Predictor, UnsupportedModelError
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = "model.json"
+
+# Исторически upload-эндпоинт искал модель в app/api/model.json
+LEGACY_MODEL_FILE = Path(__file__).resolve().parent.parent / "api" / MODEL_FILENAME
+
+
+class ModelLoader:
+    """Лениво загружает booster и следит за изменением файла модели"""
+
+    def __init__(self, model_path: str, crossover: Optional[int] = None):
+        """
+        Args:
+            model_path: Путь к model.json или к директории, где он лежит
+            crossover: Порог компилированного инференса (см. Predictor);
+                None - settings.PREDICTOR_CROSSOVER, 0 - всегда XGBoost
+        """
+        self.model_path = Path(model_path)
+        self.crossover = settings.PREDICTOR_CROSSOVER if crossover is None else crossover
+        self._booster: Optional[xgb.Booster] = None
+        self._version: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._predictor: Optional[Predictor] = None
+        self._lock = threading.Lock()
+
+    def resolve_path(self) -> Path:
+        """Находит файл модели среди известных расположений"""
+        candidates = [self.model_path]
+        if self.model_path.suffix != ".json":
+            candidates = [self.model_path / MODEL_FILENAME]
+        candidates.append(LEGACY_MODEL_FILE)
+
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        raise FileNotFoundError(f"Модель не найдена: {', '.join(str(c) for c in candidates)}")
+
+    def _load(self) -> None:
+        path = self.resolve_path()
+        raw = path.read_bytes()
+
+        logger.info(f"Загрузка ML модели: {path}")
+        booster = xgb.Booster()
+        booster.load_model(bytearray(raw))
+
+        self._booster = booster
+        self._version = hashlib.sha256(raw).hexdigest()[:16]
+        self._mtime = path.stat().st_mtime
+        # При crossover=0 компилированная модель не используется - и не собирается
+        forest = self._compile(raw) if self.crossover != 0 else None
+        self._predictor = Predictor(booster, forest, crossover=self.crossover)
+        logger.info(f"✓ Модель загружена, версия {self._version}")
+
+    @staticmethod
+    def _compile(raw: bytes) -> Optional[CompiledForest]:
+        """Компилирует model.json для быстрого инференса малых батчей"""
+        try:
+            return CompiledForest.from_json(raw)
+        except (UnsupportedModelError, ValueError, KeyError) as e:
+            logger.warning(f"Компилированный инференс недоступен: {e}")
+            return None
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._booster is None:
+                self._load()
+
+    def reload_if_changed(self) -> bool:
+        """Перезагружает модель, если файл на диске изменился"""
+        with self._lock:
+            if self._booster is None:
+                self._load()
+                return True
+            if self.resolve_path().stat().st_mtime == self._mtime:
+                return False
+            old_version = self._version
+            self._load()
+            return self._version != old_version
+
+    @property
+    def booster(self) -> xgb.Booster:
+        self._ensure_loaded()
+        return self._booster
+
+    @property
+    def predictor(self) -> Predictor:
+        """Предиктор, выбирающий между NumPy-вычислителем и XGBoost"""
+        self._ensure_loaded()
+        return self._predictor
+
+    @property
+    def version(self) -> str:
+        """Версия модели - первые 16 символов sha256 от model.json"""
+        self._ensure_loaded()
+        return self._version
+
+    @property
+    def feature_names(self) -> Optional[List[str]]:
+        return self.booster.feature_names
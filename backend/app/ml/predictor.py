@@ -0,0 +1,292 @@
+"""
+Онлайн-предиктор с компилированным NumPy-вычислителем деревьев.
+
+Для маленьких батчей (1-100 строк) основное время в booster.predict уходит
+на построение DMatrix и накладные расходы вызова, а не на обход деревьев.
+Поэтому model.json компилируется в плоские массивы узлов, которые обходятся
+векторно для всех строк и деревьев сразу. Большие батчи по-прежнему идут
+через XGBoost; порог переключения измеряется на старте.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import json
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+# Размеры батчей, на которых измеряется точка переключения
+CALIBRATION_SIZES = (1, 4, 16, 32, 64, 128, 256, 512)
+CALIBRATION_REPEATS = 5
+
+# Допуск сверки компилированной модели с XGBoost (относительный)
+SELF_CHECK_RTOL = 1e-6
+
+_IDENTITY_OBJECTIVES = {
+    "reg:squarederror",
+    "reg:squaredlogerror",
+    "reg:absoluteerror",
+    "reg:pseudohubererror",
+    "reg:quantileerror",
+}
+_LOGISTIC_OBJECTIVES = {"reg:logistic", "binary:logistic"}
+_EXP_OBJECTIVES = {"reg:gamma", "reg:tweedie", "count:poisson"}
+
+
+class UnsupportedModelError(ValueError):
+    """Модель нельзя скомпилировать (категориальные сплиты, мультикласс и т.п.)"""
+
+
+def _parse_base_score(raw: str) -> float:
+    # XGBoost 2.x пишет "5E-1", 3.x - "[5E-1]"
+    return float(str(raw).strip("[]").split(",")[0])
+
+
+class CompiledForest:
+    """
+    Ансамбль деревьев, упакованный в плоские массивы.
+
+    Узлы всех деревьев лежат подряд; у листьев дочерние индексы указывают
+    на сам лист, поэтому обход - это фиксированное число шагов (max_depth)
+    без ветвлений по строкам.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        base_margin: float,
+        objective: str,
+        feature_names: Optional[List[str]],
+        num_features: int,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.objective = objective
+        self.feature_names = feature_names
+        self.num_features = num_features
+
+    @classmethod
+    def from_json(cls, raw) -> "CompiledForest":
+        """Компилирует модель из содержимого model.json (str/bytes или dict)"""
+        model = raw if isinstance(raw, dict) else json.loads(raw)
+        learner = model["learner"]
+        booster = learner["gradient_booster"]
+
+        if booster.get("name") != "gbtree":
+            raise UnsupportedModelError(f"Поддерживается только gbtree, получено {booster.get('name')}")
+
+        params = learner["learner_model_param"]
+        if int(params.get("num_class", 0)) > 1 or int(params.get("num_target", 1)) > 1:
+            raise UnsupportedModelError("Мультиклассовые и multi-target модели не поддерживаются")
+
+        objective = learner["objective"]["name"]
+        base_score = _parse_base_score(params["base_score"])
+        if objective in _IDENTITY_OBJECTIVES:
+            base_margin = base_score
+        elif objective in _LOGISTIC_OBJECTIVES:
+            base_margin = float(np.log(base_score / (1.0 - base_score)))
+        elif objective in _EXP_OBJECTIVES:
+            base_margin = float(np.log(base_score))
+        else:
+            raise UnsupportedModelError(f"Целевая функция {objective} не поддерживается")
+
+        trees = booster["model"]["trees"]
+        features, thresholds, lefts, rights, defaults, values, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for tree in trees:
+            if any(int(t) != 0 for t in tree.get("split_type", [])):
+                raise UnsupportedModelError("Категориальные сплиты не поддерживаются")
+
+            left = np.asarray(tree["left_children"], dtype=np.int32)
+            right = np.asarray(tree["right_children"], dtype=np.int32)
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            n = len(left)
+
+            is_leaf = left == -1
+            local = np.arange(n, dtype=np.int32)
+            # Листья замыкаем на себя, значения листа хранятся в split_conditions
+            lefts.append(np.where(is_leaf, local, left) + offset)
+            rights.append(np.where(is_leaf, local, right) + offset)
+            features.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"], dtype=np.int32)))
+            thresholds.append(np.where(is_leaf, np.float32(0), cond))
+            defaults.append(np.asarray(tree["default_left"], dtype=bool))
+            values.append(np.where(is_leaf, cond, np.float32(0)))
+            roots.append(offset)
+
+            max_depth = max(max_depth, cls._tree_depth(left, right))
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features) if trees else np.empty(0, np.int32),
+            threshold=np.concatenate(thresholds) if trees else np.empty(0, np.float32),
+            left=np.concatenate(lefts) if trees else np.empty(0, np.int32),
+            right=np.concatenate(rights) if trees else np.empty(0, np.int32),
+            default_left=np.concatenate(defaults) if trees else np.empty(0, bool),
+            value=np.concatenate(values) if trees else np.empty(0, np.float32),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            base_margin=base_margin,
+            objective=objective,
+            feature_names=learner.get("feature_names") or None,
+            num_features=int(params["num_feature"]),
+        )
+
+    @staticmethod
+    def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+        depth = 0
+        level = [0]
+        while level:
+            children = [c for node in level for c in (left[node], right[node]) if c != -1]
+            if not children:
+                break
+            depth += 1
+            level = children
+        return depth
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """Сумма листьев + base_margin для матрицы признаков (float32)"""
+        n_rows = X.shape[0]
+        if n_rows == 0:
+            return np.empty(0, dtype=np.float32)
+
+        rows = np.arange(n_rows)[:, None]
+        idx = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            fvalue = X[rows, self.feature[idx]]
+            go_left = np.where(np.isnan(fvalue), self.default_left[idx], fvalue < self.threshold[idx])
+            idx = np.where(go_left, self.left[idx], self.right[idx])
+
+        # Как и XGBoost, начинаем с base_margin и прибавляем листья по порядку
+        # деревьев во float32 - cumsum последовательна, результат совпадает побитово
+        leaves = np.empty((n_rows, len(self.roots) + 1), dtype=np.float32)
+        leaves[:, 0] = self.base_margin
+        leaves[:, 1:] = self.value[idx]
+        return np.cumsum(leaves, axis=1, dtype=np.float32)[:, -1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        margin = self.predict_margin(X)
+        if self.objective in _LOGISTIC_OBJECTIVES:
+            return np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))
+        if self.objective in _EXP_OBJECTIVES:
+            return np.exp(margin)
+        return margin
+
+
+class Predictor:
+    """
+    Выбирает путь инференса по размеру батча.
+
+    Батчи до crossover строк считаются CompiledForest, большие - XGBoost.
+    crossover задаётся явно или измеряется при первом обращении.
+    """
+
+    def __init__(
+        self,
+        booster: xgb.Booster,
+        forest: Optional[CompiledForest] = None,
+        crossover: Optional[int] = None,
+    ):
+        self.booster = booster
+        self.forest = forest
+        self._crossover = crossover if forest is not None else 0
+        # Явный crossover пропускает calibrate(), но не сверку с XGBoost
+        if self.forest is not None and self._crossover and not self._forest_matches():
+            self._crossover = 0
+
+    @property
+    def crossover(self) -> int:
+        if self._crossover is None:
+            self._crossover = self.calibrate()
+        return self._crossover
+
+    def _to_matrix(self, X: pd.DataFrame) -> np.ndarray:
+        if self.forest.feature_names and isinstance(X, pd.DataFrame):
+            X = X[self.forest.feature_names]
+        return np.asarray(X, dtype=np.float32)
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        """Предсказания в том же виде, что и booster.predict (float32)"""
+        if self.forest is not None and 0 < len(X) <= self.crossover:
+            return self.forest.predict(self._to_matrix(X))
+        return self.booster.predict(xgb.DMatrix(X))
+
+    def _sample_matrix(self, n_rows: int, seed: int = 0) -> np.ndarray:
+        """Синтетические строки из порогов сплитов - проходят по разным веткам"""
+        rng = np.random.default_rng(seed)
+        X = np.zeros((n_rows, self.forest.num_features), dtype=np.float32)
+        splits = self.forest.left != np.arange(len(self.forest.left))
+        for f in range(self.forest.num_features):
+            thresholds = self.forest.threshold[splits & (self.forest.feature == f)]
+            if len(thresholds):
+                X[:, f] = rng.choice(thresholds, n_rows) + rng.normal(0, 1e-3, n_rows).astype(np.float32)
+        X[rng.random(X.shape) < 0.05] = np.nan
+        return X
+
+    def _dmatrix(self, X: np.ndarray) -> xgb.DMatrix:
+        return xgb.DMatrix(X, feature_names=self.forest.feature_names)
+
+    def self_check(self, n_rows: int = 256) -> bool:
+        """Сверяет компилированную модель с XGBoost на синтетических строках"""
+        X = self._sample_matrix(n_rows, seed=42)
+        expected = self.booster.predict(self._dmatrix(X))
+        actual = self.forest.predict(X)
+        return bool(np.allclose(actual, expected, rtol=SELF_CHECK_RTOL, atol=1e-3))
+
+    def _forest_matches(self) -> bool:
+        """self_check(); при расхождении компилированная модель отключается"""
+        if self.self_check():
+            return True
+        logger.warning("Компилированная модель расходится с XGBoost, используется только XGBoost")
+        self.forest = None
+        return False
+
+    def calibrate(self, sizes: Sequence[int] = CALIBRATION_SIZES) -> int:
+        """
+        Измеряет наибольший размер батча, на котором компилированный путь
+        быстрее XGBoost. Возвращает 0, если компилированный путь не нужен.
+        """
+        if self.forest is None or not self._forest_matches():
+            return 0
+
+        timings: Dict[int, tuple] = {}
+        crossover = 0
+        for size in sizes:
+            X = self._sample_matrix(size)
+            compiled = min(self._time(lambda: self.forest.predict(X)) for _ in range(CALIBRATION_REPEATS))
+            native = min(self._time(lambda: self.booster.predict(self._dmatrix(X))) for _ in range(CALIBRATION_REPEATS))
+            timings[size] = (compiled, native)
+            if compiled >= native:
+                break
+            crossover = size
+
+        logger.info(
+            f"✓ Порог компилированного инференса: {crossover} строк "
+            f"({', '.join(f'{s}: {c * 1e3:.2f}/{n * 1e3:.2f} ms' for s, (c, n) in timings.items())})"
+        )
+        return crossover
+
+    @staticmethod
+    def _time(fn) -> float:
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
@@ -5,8 +5,14 @@
 from typing import Dict, Optional
 import logging
 
+import numpy as np
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Колонки clients, в которых хранится решение по кредиту (считаются при загрузке)
+DECISION_COLUMNS = ['debt_burden_ratio', 'risk_level', 'recommendation', 'credit_eligible', 'reasoning']
+
 def calculate_credit_decision(client_data: Dict) -> Dict:
     """
     Вычисляет решение по кредиту на основе метрик.
@@ -99,6 +105,138 @@ def calculate_credit_decision(client_data: Dict) -> Dict:
         "reasoning": reasoning
     }
 
+# Таблицы кодов для векторного расчёта: код в массиве - индекс в таблице
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
+RECOMMENDATIONS = ("APPROVE", "REVIEW", "REJECT")
+REASONINGS = (
+    "Низкая долговая нагрузка, стабильный доход",
+    "Средняя долговая нагрузка, но высокий доход позволяет одобрить",
+    "Средняя долговая нагрузка, требуется дополнительный анализ",
+    "Высокая долговая нагрузка, риск дефолта",
+    "Сумма просрочки превышает 80% дохода",
+    "Запрашиваемая сумма кредита превышает 200% дохода",
+    "Низкий кредитовый оборот относительно дохода",
+)
+LOW, MEDIUM, HIGH = range(3)
+APPROVE, REVIEW, REJECT = range(3)
+(
+    REASON_LOW_BURDEN, REASON_MEDIUM_HIGH_INCOME, REASON_MEDIUM_BURDEN, REASON_HIGH_BURDEN,
+    REASON_OVERDUE, REASON_LOAN_AMOUNT, REASON_LOW_TURNOVER,
+) = range(len(REASONINGS))
+
+def _float_array(data, column: str) -> np.ndarray:
+    values = data[column]
+    return values.to_numpy(dtype=float) if isinstance(values, pd.Series) else np.asarray(values, dtype=float)
+
+def _zero_nan(values: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(values), 0.0, values)
+
+def calculate_credit_decisions_batch(data) -> Dict[str, np.ndarray]:
+    """
+    Векторный расчёт решений по кредиту на масках NumPy.
+    
+    Те же правила и тот же порядок их применения, что в calculate_credit_decision:
+    базовый уровень риска по долговой нагрузке, затем проверки просрочки и суммы
+    кредита (перекрывают базовое решение), затем проверка оборота.
+    
+    Args:
+        data: DataFrame или dict массивов с ключами incomeValue, ovrd_sum,
+            loan_cur_amt, avg_cur_cr_turn (NaN - значение неизвестно)
+    
+    Returns:
+        dict массивов одной длины:
+            - has_decision: bool - решение определено (incomeValue ненулевой, ovrd_sum известна)
+            - debt_burden_ratio: float
+            - risk_level: int8 - индекс в RISK_LEVELS
+            - recommendation: int8 - индекс в RECOMMENDATIONS
+            - credit_eligible: bool
+            - reasoning: int8 - индекс в REASONINGS
+    """
+    income = _float_array(data, 'incomeValue')
+    ovrd = _float_array(data, 'ovrd_sum')
+    has_decision = ~np.isnan(income) & (income != 0) & ~np.isnan(ovrd)
+    
+    predicted_income = _zero_nan(income)
+    total_debt = _zero_nan(ovrd)
+    loan_amount = _zero_nan(_float_array(data, 'loan_cur_amt'))
+    avg_cur_cr_turn = _zero_nan(_float_array(data, 'avg_cur_cr_turn'))
+    positive_income = predicted_income > 0
+    
+    # Долговая нагрузка: просрочка / доход
+    debt_burden_ratio = np.zeros_like(predicted_income)
+    np.divide(total_debt, predicted_income, out=debt_burden_ratio, where=positive_income)
+    
+    # Уровень риска и базовая рекомендация (np.copyto с where - присваивание по маске без индексации)
+    risk_level = np.full(len(income), HIGH, dtype=np.int8)
+    np.copyto(risk_level, MEDIUM, where=debt_burden_ratio < 0.6)
+    np.copyto(risk_level, LOW, where=debt_burden_ratio < 0.3)
+    low_risk = risk_level == LOW
+    medium_risk = risk_level == MEDIUM
+    medium_high_income = medium_risk & (predicted_income >= 150000)
+    credit_eligible = low_risk | medium_high_income
+    
+    recommendation = np.full(len(income), REJECT, dtype=np.int8)
+    np.copyto(recommendation, REVIEW, where=medium_risk)
+    np.copyto(recommendation, APPROVE, where=credit_eligible)
+    
+    reasoning = np.full(len(income), REASON_HIGH_BURDEN, dtype=np.int8)
+    np.copyto(reasoning, REASON_MEDIUM_BURDEN, where=medium_risk)
+    np.copyto(reasoning, REASON_MEDIUM_HIGH_INCOME, where=medium_high_income)
+    np.copyto(reasoning, REASON_LOW_BURDEN, where=low_risk)
+    
+    # Дополнительные проверки - в том же порядке, более поздние перекрывают ранние
+    for mask, reason in (
+        ((total_debt > predicted_income * 0.8) & positive_income, REASON_OVERDUE),
+        ((loan_amount > predicted_income * 2) & positive_income, REASON_LOAN_AMOUNT),
+    ):
+        credit_eligible &= ~mask
+        np.copyto(recommendation, REJECT, where=mask)
+        np.copyto(reasoning, reason, where=mask)
+        np.copyto(risk_level, HIGH, where=mask)
+    
+    low_turnover = (avg_cur_cr_turn > 0) & (avg_cur_cr_turn < predicted_income * 0.3) & (risk_level == LOW)
+    np.copyto(risk_level, MEDIUM, where=low_turnover)
+    review = low_turnover & credit_eligible
+    np.copyto(recommendation, REVIEW, where=review)
+    np.copyto(reasoning, REASON_LOW_TURNOVER, where=review)
+    
+    return {
+        'has_decision': has_decision,
+        'debt_burden_ratio': debt_burden_ratio,
+        'risk_level': risk_level,
+        'recommendation': recommendation,
+        'credit_eligible': credit_eligible,
+        'reasoning': reasoning,
+    }
+
+def decode_codes(codes: np.ndarray, table: tuple) -> np.ndarray:
+    """Коды из calculate_credit_decisions_batch -> строки (object-массив)"""
+    return np.array(table, dtype=object)[codes]
+
+def calculate_credit_decisions_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Решения по кредиту для датафрейма клиентов (колонки DECISION_COLUMNS).
+    
+    Считается через calculate_credit_decisions_batch; у клиентов без решения
+    (нулевой или неизвестный incomeValue, неизвестная ovrd_sum) колонки пустые.
+    
+    Args:
+        df: Датафрейм с колонками incomeValue, ovrd_sum, loan_cur_amt, avg_cur_cr_turn
+    
+    Returns:
+        датафрейм с колонками DECISION_COLUMNS и индексом df
+    """
+    batch = calculate_credit_decisions_batch(df)
+    result = pd.DataFrame({
+        'debt_burden_ratio': batch['debt_burden_ratio'],
+        'risk_level': decode_codes(batch['risk_level'], RISK_LEVELS),
+        'recommendation': decode_codes(batch['recommendation'], RECOMMENDATIONS),
+        'credit_eligible': batch['credit_eligible'].astype(object),
+        'reasoning': decode_codes(batch['reasoning'], REASONINGS),
+    }, index=df.index)
+    result.loc[~batch['has_decision'], DECISION_COLUMNS] = None
+    return result
+
 def get_risk_level_color(risk_level: str) -> str:
     """
     Возвращает цвет для уровня риска.
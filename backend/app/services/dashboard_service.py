@@ -0,0 +1,107 @@
+"""
+Снимок dashboard: агрегаты клиентов, пересчитываемые при загрузке.
+
+Данные dashboard меняются только при загрузке клиентов, поэтому агрегаты
+считаются один раз в конце загрузки и сохраняются в dashboard_snapshot с
+номером поколения данных; GET /dashboard читает готовую строку.
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple
+import logging
+import time
+
+from sqlalchemy import Row, delete, func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.data.database import engine, read_session
+from app.data.models import DashboardSnapshot
+from app.data.repositories.dashboard_repository import DashboardSnapshotRepository
+from app.data.repositories.client_repository import INCOME_CATEGORIES, dashboard_aggregates_query
+
+logger = logging.getLogger(__name__)
+
+def aggregates_to_dict(aggregates: Row) -> dict:
+    """Строка dashboard_aggregates_query -> данные снимка"""
+    return {
+        "total_clients": aggregates.total_clients,
+        "avg_income": float(aggregates.avg_income) if aggregates.avg_income is not None else None,
+        "approved": aggregates.approved,
+        "rejected": aggregates.rejected,
+        "review": aggregates.review,
+        "income_distribution": {
+            category: getattr(aggregates, f"income_{category}")
+            for category in [name for name, _ in INCOME_CATEGORIES] + ["UNKNOWN"]
+        },
+    }
+
+def refresh_dashboard_snapshot(bind: Optional[Engine] = None) -> int:
+    """
+    Пересчитывает агрегаты и сохраняет их как новое поколение данных.
+
+    Вызывается в конце каждой загрузки клиентов (replace и upsert): один
+    проход агрегации по clients. Предыдущие поколения удаляются.
+
+    Returns:
+        Номер нового поколения
+    """
+    bind = bind or engine
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Параллельные загрузки не должны получить одинаковый номер поколения
+            conn.execute(text(f"LOCK TABLE {DashboardSnapshot.__tablename__} IN EXCLUSIVE MODE"))
+        generation = conn.execute(
+            select(func.coalesce(func.max(DashboardSnapshot.generation), 0) + 1)
+        ).scalar()
+        refreshed_at = datetime.utcnow()
+        conn.execute(insert(DashboardSnapshot).values(
+            generation=generation,
+            data=aggregates_to_dict(conn.execute(dashboard_aggregates_query()).one()),
+            refreshed_at=refreshed_at
+        ))
+        conn.execute(delete(DashboardSnapshot).where(DashboardSnapshot.generation < generation))
+
+    dataset_generation.set(generation, refreshed_at)
+    logger.info(f"✓ Dashboard snapshot refreshed: generation {generation}")
+    return generation
+
+class DatasetGeneration:
+    """
+    Текущее поколение данных клиентов для ETag / Last-Modified.
+
+    Значение держится в памяти процесса и перечитывается из БД не чаще раза
+    в ttl секунд, поэтому условные запросы обычно отвечают 304 без обращения
+    к БД. Загрузка в этом же процессе обновляет значение сразу; другие
+    процессы увидят новое поколение не позже чем через ttl.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Optional[Tuple[int, Optional[datetime]]] = None
+        self._checked_at = 0.0
+
+    def set(self, generation: int, refreshed_at: Optional[datetime]) -> None:
+        self._value = (generation, refreshed_at)
+        self._checked_at = time.monotonic()
+
+    async def current(self) -> Tuple[int, Optional[datetime]]:
+        """(номер поколения, время пересчёта); (0, None) - загрузок ещё не было"""
+        if self._value is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._value
+        async with read_session() as db:
+            latest = await DashboardSnapshotRepository(db).latest_generation()
+        self.set(*(latest if latest is not None else (0, None)))
+        return self._value
+
+dataset_generation = DatasetGeneration(settings.DATASET_GENERATION_TTL_SECONDS)
+
+async def session_generation(db) -> int:
+    """
+    Поколение данных, которое видит сессия чтения.
+
+    Реплика может отставать от только что завершённой загрузки; ответ,
+    посчитанный на ней, нельзя кешировать под новым поколением.
+    """
+    latest = await DashboardSnapshotRepository(db).latest_generation()
+    return latest.generation if latest is not None else 0
@@ -0,0 +1,83 @@
+"""
+Распределение числового поля клиентов: гистограмма и квантили, посчитанные в SQL.
+
+Наружу уходят только агрегаты - границы корзин, счётчики и квантили, - строки
+клиентов не читаются в приложение.
+"""
+
+from typing import List, Optional
+import math
+
+from app.data.repositories.client_repository import ClientRepository
+
+# Квантили в ответе (percentile_cont)
+DISTRIBUTION_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Шкалы гистограммы: log - корзины равной ширины по ln(x), только x > 0
+DISTRIBUTION_SCALES = ("linear", "log")
+
+def _quantiles_to_dict(values) -> Optional[dict]:
+    if values is None:
+        return None
+    return {f"p{round(q * 100)}": value for q, value in zip(DISTRIBUTION_QUANTILES, values)}
+
+def _summary(stats, counts: List[int]) -> dict:
+    return {
+        "total": stats.total,
+        "nulls": stats.nulls,
+        "excluded": stats.excluded,
+        "counts": counts,
+        "quantiles": _quantiles_to_dict(stats.quantiles),
+    }
+
+async def client_distribution(
+    repo: ClientRepository,
+    field: str,
+    bins: int,
+    scale: str = "linear",
+    group_by: Optional[str] = None,
+) -> dict:
+    """
+    Гистограмма поля с bins корзинами равной ширины и квантили.
+
+    Границы корзин общие для всех групп (по min/max всего набора), поэтому
+    counts групп можно сравнивать и складывать. Для scale=log границы
+    возвращаются в исходных единицах (exp от границ в шкале ln).
+    """
+    log_scale = scale == "log"
+    (overall,) = await repo.distribution_stats(field, log_scale, DISTRIBUTION_QUANTILES)
+
+    if overall.lo is None:
+        # Нет ни одного значения в шкале - пустая гистограмма
+        edges, bins, histogram = [], 0, []
+    else:
+        lo, hi = float(overall.lo), float(overall.hi)
+        if hi <= lo:
+            bins = 1
+        width = (hi - lo) / bins
+        edges = [lo + width * i for i in range(bins)] + [hi]
+        if log_scale:
+            edges = [math.exp(edge) for edge in edges]
+        histogram = await repo.histogram(field, lo, hi, bins, log_scale, group_by)
+
+    result = {
+        "field": field,
+        "scale": scale,
+        "bins": bins,
+        "edges": edges,
+        **_summary(overall, [0] * bins),
+    }
+    if group_by is None:
+        for bucket, count in histogram:
+            result["counts"][bucket - 1] = count
+        return result
+
+    groups = {}
+    for stats in await repo.distribution_stats(field, log_scale, DISTRIBUTION_QUANTILES, group_by):
+        groups[stats[0]] = {group_by: stats[0], **_summary(stats, [0] * bins)}
+    for group, bucket, count in histogram:
+        groups[group]["counts"][bucket - 1] = count
+        result["counts"][bucket - 1] += count
+    result["group_by"] = group_by
+    result["groups"] = list(groups.values())
+    return result
@@ -0,0 +1,100 @@
+"""
+Потоковая выгрузка клиентов в CSV / NDJSON / Parquet.
+
+Строки приходят пачками из серверного курсора и сразу превращаются в байты
+ответа - в памяти держится одна пачка, а не вся выгрузка.
+"""
+
+from typing import AsyncIterator, Callable, Dict, List, Sequence, Tuple
+import csv
+import io
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Float, Integer, Row
+
+from app.data.models import Client
+
+Partitions = AsyncIterator[List[Row]]
+
+async def csv_chunks(fields: Sequence[str], partitions: Partitions) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def ndjson_chunks(fields: Sequence[str], partitions: Partitions) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(
+            orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+        )
+
+# Типы колонок clients -> типы Arrow (схема Parquet задаётся заранее, а не выводится по пачке)
+ARROW_TYPES = (
+    (Boolean, pa.bool_()),
+    (Float, pa.float64()),
+    (Integer, pa.int64()),
+    (DateTime, pa.timestamp("us")),
+)
+
+def arrow_schema(fields: Sequence[str]) -> pa.Schema:
+    def arrow_type(column):
+        for sql_type, arrow in ARROW_TYPES:
+            if isinstance(column.type, sql_type):
+                return arrow
+        return pa.string()
+    return pa.schema([(name, arrow_type(Client.__table__.c[name])) for name in fields])
+
+class _ChunkSink(io.RawIOBase):
+    """Файл для ParquetWriter, из которого записанные байты забираются по частям"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def parquet_chunks(fields: Sequence[str], partitions: Partitions) -> AsyncIterator[bytes]:
+    """Parquet по row group на пачку; футер с метаданными - последним куском"""
+    schema = arrow_schema(fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in partitions:
+            columns = list(zip(*rows))
+            writer.write_table(pa.table(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+# Формат -> (media type, расширение файла, генератор байтов)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, Callable[[Sequence[str], Partitions], AsyncIterator[bytes]]]] = {
+    "csv": ("text/csv; charset=utf-8", "csv", csv_chunks),
+    "ndjson": ("application/x-ndjson", "ndjson", ndjson_chunks),
+    "parquet": ("application/vnd.apache.parquet", "parquet", parquet_chunks),
+}
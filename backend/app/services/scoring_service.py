@@ -0,0 +1,173 @@
+"""
+Сервис скоринга клиентов ML моделью.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.data.cache import CacheManager
+from app.ml.model_loader import ModelLoader
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['id', 'incomeValue']
+
+# Колонки, которые не являются признаками модели
+NON_FEATURE_COLUMNS = ["target", "w"]
+
+def prepare_features(
+    df: pd.DataFrame,
+    feature_names: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Проверяет входной датафрейм и отделяет признаки для модели.
+
+    Args:
+        df: Входной датафрейм
+        feature_names: Признаки модели; если заданы, берутся ровно они
+            и в этом порядке, остальные колонки игнорируются
+
+    Returns:
+        (очищенный датафрейм, признаки для предсказания)
+    """
+    # Проверяем обязательные поля
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Отсутствуют обязательные колонки: {missing_columns}")
+    
+    # Убираем первые две колонки если они есть (обычно это индексы)
+    if len(df.columns) > 2 and df.columns[0] == 'Unnamed: 0':
+        df = df.iloc[:, 2:]
+        logger.info("Удалены индексные колонки")
+    
+    if feature_names:
+        missing_features = [col for col in feature_names if col not in df.columns]
+        if missing_features:
+            raise ValueError(f"Отсутствуют признаки модели: {missing_features}")
+        return df, df[feature_names]
+    
+    # Подготовка признаков (без 'target' и 'w' если они есть)
+    X = df.drop(columns=[col for col in NON_FEATURE_COLUMNS if col in df.columns])
+    return df, X
+
+def build_prediction_frame(df: pd.DataFrame, predictions: np.ndarray) -> pd.DataFrame:
+    """
+    Собирает результирующий датафрейм (формат fin_clients.csv).
+
+    Поля: id, target, incomeValue, avg_cur_cr_turn, ovrd_sum, loan_cur_amt,
+    hdb_income_ratio, PDN
+    """
+    hdb_income_ratio = df.get('hdb_income_ratio', None)
+    PDN = None
+    if 'hdb_outstand_sum' in df.columns and 'incomeValue' in df.columns:
+        hdb_income_ratio = df['hdb_outstand_sum'] / df['incomeValue']
+        # Показатель долговой нагрузки
+        PDN = hdb_income_ratio * 100
+    
+    pred_df = pd.DataFrame({
+        "id": df['id'].astype(str),  # ID как строка для совместимости с БД
+        "target": predictions,  # Предсказанный доход
+        "incomeValue": df['incomeValue'],
+        "avg_cur_cr_turn": df.get('avg_cur_cr_turn', None),
+        "ovrd_sum": df.get('ovrd_sum', 0.0),
+        "loan_cur_amt": df.get('loan_cur_amt', 0.0),
+        "hdb_income_ratio": hdb_income_ratio,
+        "PDN": PDN
+    })
+    
+    # Заполняем NaN значения
+    pred_df['ovrd_sum'] = pred_df['ovrd_sum'].fillna(0.0)
+    pred_df['loan_cur_amt'] = pred_df['loan_cur_amt'].fillna(0.0)
+    return pred_df
+
+def predict_with_cache(
+    model_loader: ModelLoader,
+    X: pd.DataFrame,
+    cache: Optional[CacheManager] = None,
+) -> Tuple[np.ndarray, Dict]:
+    """
+    Предсказывает доход для батча, скоря моделью только промахи кеша.
+
+    Весь батч ищется в кеше за один проход (LRU, затем MGET в Redis),
+    промахи скорятся одним вызовом предиктора и дописываются в кеш.
+
+    Args:
+        model_loader: Загрузчик модели
+        X: Признаки в порядке, ожидаемом моделью
+        cache: Кеш предсказаний (None - скорим всё без кеша)
+
+    Returns:
+        (массив предсказаний, статистика кеша {'hits', 'misses'})
+    """
+    predictor = model_loader.predictor
+
+    if cache is None or len(X) == 0:
+        predictions = predictor.predict(X) if len(X) else np.empty(0, dtype=np.float32)
+        return predictions, {"hits": 0, "misses": len(X)}
+
+    cache.ensure_model_version(model_loader.version)
+    keys = cache.prediction_keys(model_loader.version, X)
+    predictions, hit_mask = cache.get_predictions(keys)
+
+    miss_idx = np.flatnonzero(~hit_mask)
+    if len(miss_idx):
+        scored = predictor.predict(X.iloc[miss_idx])
+        predictions[miss_idx] = scored
+        cache.set_predictions([keys[i] for i in miss_idx], scored)
+
+    stats = {"hits": int(hit_mask.sum()), "misses": int(len(miss_idx))}
+    logger.info(f"Кеш предсказаний: {stats['hits']} попаданий, {stats['misses']} промахов")
+    return predictions.astype(np.float32), stats
+
+def feature_hashes(model_version: str, X: pd.DataFrame) -> np.ndarray:
+    """
+    Хеш признаков каждой строки, привязанный к версии модели и набору колонок.
+
+    Совпадение хеша с сохранённым значит, что предсказание для клиента
+    не изменится и его можно не пересчитывать.
+    """
+    salt = hashlib.sha1(f"{model_version}:{','.join(map(str, X.columns))}".encode()).digest()
+    salt = np.uint64(int.from_bytes(salt[:8], "little"))
+    row_hashes = pd.util.hash_pandas_object(X, index=False).to_numpy() ^ salt
+    return np.array([f"{h:016x}" for h in row_hashes.tolist()], dtype=object)
+
+def predict_incremental(
+    model_loader: ModelLoader,
+    X: pd.DataFrame,
+    ids: pd.Series,
+    stored: pd.DataFrame,
+    cache: Optional[CacheManager] = None,
+) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """
+    Предсказывает только строки, чьи признаки изменились с прошлой загрузки.
+
+    Args:
+        model_loader: Загрузчик модели
+        X: Признаки в порядке, ожидаемом моделью
+        ids: id клиентов, построчно соответствующие X
+        stored: Сохранённые feature_hash и target, индекс - id клиента
+        cache: Кеш предсказаний для изменённых строк
+
+    Returns:
+        (предсказания, хеши признаков, статистика {'reused', 'hits', 'misses'})
+    """
+    hashes = feature_hashes(model_loader.version, X)
+    ids = ids.astype(str).to_numpy()
+    stored_hashes = stored['feature_hash'].reindex(ids).to_numpy()
+    reuse_mask = stored_hashes == hashes
+
+    predictions = np.empty(len(X), dtype=np.float32)
+    predictions[reuse_mask] = stored['target'].reindex(ids).to_numpy()[reuse_mask]
+
+    changed_idx = np.flatnonzero(~reuse_mask)
+    stats = {"hits": 0, "misses": 0}
+    if len(changed_idx):
+        predictions[changed_idx], stats = predict_with_cache(model_loader, X.iloc[changed_idx], cache)
+
+    stats = {"reused": int(reuse_mask.sum()), **stats}
+    logger.info(f"Признаки не изменились у {stats['reused']} клиентов, скоринг пропущен")
+    return predictions, hashes, stats
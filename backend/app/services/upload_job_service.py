@@ -0,0 +1,145 @@
+"""
+Фоновые задачи загрузки CSV.
+
+Эндпоинт загрузки только сохраняет файл и ставит задачу в очередь;
+парсинг, скоринг и загрузка в БД выполняются в фоновом потоке, а прогресс
+доступен по job id. Реестр задач хранится в памяти процесса.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Сколько завершённых задач хранить для опроса статуса
+MAX_FINISHED_JOBS = 100
+
+class UploadJob:
+    """Состояние одной задачи загрузки"""
+
+    STAGES = ("queued", "parse", "score", "ingest", "warmup", "done")
+
+    def __init__(self, filename: str):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "queued"  # queued / running / completed / failed
+        self.stage = "queued"
+        self.rows_total: Optional[int] = None
+        self.rows_done = 0
+        self.errors: List[str] = []
+        self.result: Optional[dict] = None
+        self.stage_timings: Dict[str, float] = {}
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._stage_started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def start_stage(self, stage: str, rows_total: Optional[int] = None) -> None:
+        """Переводит задачу на следующий этап (parse / score / ingest)"""
+        with self._lock:
+            self._finish_stage()
+            self.status = "running"
+            self.stage = stage
+            self.rows_done = 0
+            if rows_total is not None:
+                self.rows_total = rows_total
+            self._stage_started = time.monotonic()
+        logger.info(f"Задача {self.job_id}: этап {stage}")
+
+    def set_progress(self, rows_done: int, rows_total: Optional[int] = None) -> None:
+        with self._lock:
+            self.rows_done = rows_done
+            if rows_total is not None:
+                self.rows_total = rows_total
+
+    def add_errors(self, errors: List[str]) -> None:
+        with self._lock:
+            self.errors.extend(errors)
+
+    def complete(self, result: dict) -> None:
+        with self._lock:
+            self._finish_stage()
+            self.status = "completed"
+            self.stage = "done"
+            self.result = result
+            self.finished_at = datetime.utcnow()
+
+    def fail(self, error: str) -> None:
+        with self._lock:
+            self._finish_stage()
+            self.status = "failed"
+            self.errors.append(error)
+            self.finished_at = datetime.utcnow()
+
+    def _finish_stage(self) -> None:
+        if self.stage in self.STAGES[1:-1]:
+            self.stage_timings[self.stage] = round(time.monotonic() - self._stage_started, 3)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            elapsed = time.monotonic() - self._stage_started
+            running = self.status == "running"
+            return {
+                "job_id": self.job_id,
+                "filename": self.filename,
+                "status": self.status,
+                "stage": self.stage,
+                "rows_total": self.rows_total,
+                "rows_done": self.rows_done,
+                "rows_per_sec": round(self.rows_done / elapsed) if running and elapsed > 0 else None,
+                "stage_timings": dict(self.stage_timings),
+                "errors": list(self.errors),
+                "result": self.result,
+                "created_at": self.created_at.isoformat() + "Z",
+                "finished_at": self.finished_at.isoformat() + "Z" if self.finished_at else None,
+            }
+
+class UploadJobManager:
+    """
+    Очередь задач загрузки.
+
+    Один рабочий поток: загрузки полностью перезаписывают таблицу clients,
+    поэтому выполнять их параллельно нет смысла.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload-job")
+        self._jobs: Dict[str, UploadJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, filename: str, pipeline: Callable[[UploadJob], dict]) -> UploadJob:
+        """Ставит pipeline(job) в очередь и сразу возвращает задачу"""
+        job = UploadJob(filename)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job, pipeline)
+        return job
+
+    def get(self, job_id: str) -> Optional[UploadJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: UploadJob, pipeline: Callable[[UploadJob], dict]) -> None:
+        try:
+            job.complete(pipeline(job))
+            logger.info(f"✓ Задача {job.job_id} завершена")
+        except Exception as e:
+            logger.error(f"❌ Задача {job.job_id} завершилась ошибкой: {e}", exc_info=True)
+            job.fail(str(e))
+
+    def _evict_finished(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.job_id]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+upload_jobs = UploadJobManager()
@@ -0,0 +1,115 @@
+"""
+Прогрев кешей после загрузки клиентов и при старте приложения.
+
+Dashboard и первые страницы списка кешируются по поколению данных, поэтому
+после загрузки (и после рестарта) первый пользователь платил бы за холодные
+кеши и буферы БД. Прогрев запрашивает эти ответы у самого приложения через
+ASGI - тем же кодом, что и пользователь, - в пределах бюджета времени.
+"""
+
+from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.security import create_access_token
+
+logger = logging.getLogger(__name__)
+
+# Сортировки списка клиентов, которые предлагает UI (порядок по умолчанию - desc)
+WARMUP_SORTS = ("incomeValue", "target", "ovrd_sum", "loan_cur_amt", "hdb_income_ratio")
+
+# Размер страницы, который запрашивает UI
+WARMUP_PAGE_SIZE = 50
+
+class CacheWarmer:
+    """
+    Прогрев кешей приложения; статус последнего прогрева - для /health.
+
+    status: pending (ещё не запускался) / running / complete / timeout
+    (бюджет времени исчерпан, прогрето частично) / failed.
+    """
+
+    def __init__(self):
+        self.status = "pending"
+        self.reason: Optional[str] = None
+        self.pages = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.duration: Optional[float] = None
+        self._app: Optional[FastAPI] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, app: FastAPI) -> None:
+        """Привязка к приложению и его event loop (вызывается в lifespan)"""
+        self._app = app
+        self._loop = asyncio.get_running_loop()
+
+    async def run(self, reason: str) -> dict:
+        """Прогрев в пределах WARMUP_TIME_BUDGET_SECONDS; ошибки не пробрасываются"""
+        self.status, self.reason, self.pages, self.error = "running", reason, 0, None
+        self.started_at, self.finished_at = datetime.utcnow(), None
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._warm(), timeout=settings.WARMUP_TIME_BUDGET_SECONDS)
+            self.status = "complete"
+        except asyncio.TimeoutError:
+            self.status = "timeout"
+            logger.warning(f"⚠ Прогрев ({reason}) не уложился в {settings.WARMUP_TIME_BUDGET_SECONDS}s")
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+            logger.error(f"❌ Прогрев ({reason}) завершился ошибкой: {e}")
+        self.duration = round(time.monotonic() - started, 3)
+        self.finished_at = datetime.utcnow()
+        if self.status == "complete":
+            logger.info(f"✓ Прогрев ({reason}): dashboard и {self.pages} страниц за {self.duration}s")
+        return self.to_dict()
+
+    def run_from_thread(self, reason: str) -> dict:
+        """Прогрев из рабочего потока (задача загрузки): выполняется в event loop приложения"""
+        if self._loop is None or self._loop.is_closed():
+            return {"status": "skipped"}
+        future = asyncio.run_coroutine_threadsafe(self.run(reason), self._loop)
+        return future.result()
+
+    async def _warm(self) -> None:
+        token = create_access_token({"sub": "warmup"})
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self._app),
+            base_url="http://warmup",
+            headers={"Authorization": f"Bearer {token}"}
+        ) as client:
+            response = await client.get("/api/v1/dashboard")
+            response.raise_for_status()
+            await asyncio.gather(*(self._warm_pages(client, sort) for sort in WARMUP_SORTS))
+
+    async def _warm_pages(self, client: httpx.AsyncClient, sort: str) -> None:
+        """Первые WARMUP_PAGES страниц одной сортировки - по next_cursor, как листает UI"""
+        params = {"sort": sort, "order": "desc", "limit": WARMUP_PAGE_SIZE}
+        for _ in range(settings.WARMUP_PAGES):
+            response = await client.get("/api/v1/clients", params=params)
+            response.raise_for_status()
+            self.pages += 1
+            next_cursor = response.json()["next_cursor"]
+            if not next_cursor:
+                break
+            params["cursor"] = next_cursor
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "reason": self.reason,
+            "pages": self.pages,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration": self.duration,
+        }
+
+cache_warmer = CacheWarmer()
@@ -0,0 +1,194 @@
+"""
+Офлайн-скоринг больших CSV файлов (десятки миллионов строк).
+
+Скрипт:
+1. Делит входной CSV на шарды по диапазонам байт, выравненным по границам строк
+2. Каждый из N процессов загружает модель один раз и скорит свои шарды
+3. Результаты пишутся по шардам (part-00000.csv, ...) и, по умолчанию,
+   склеиваются в один файл в исходном порядке строк
+
+Ограничение: строки CSV не должны содержать переводов строк внутри кавычек
+(для выгрузок признаков это так) - иначе граница шарда может попасть внутрь записи.
+
+Использование:
+  python scripts/generate_submission.py <input_csv> [output_csv] [--workers N] [--split]
+"""
+
+import argparse
+import io
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Добавляем путь к корню проекта
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+import logging
+
+from app.core.config import settings
+from app.ml.model_loader import ModelLoader
+from app.ml.preprocessor import CSV_ENGINE, needed_columns
+from app.services.scoring_service import prepare_features, build_prediction_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE_MB = 64
+PART_TEMPLATE = "part-{:05d}.csv"
+
+# Модель загружается один раз на процесс-воркер
+_worker_model: Optional[ModelLoader] = None
+
+def plan_shards(input_path: Path, shard_size: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Делит файл на диапазоны байт [start, end), выравненные по концам строк.
+
+    Returns:
+        (строка заголовка, список диапазонов)
+    """
+    file_size = input_path.stat().st_size
+    with open(input_path, 'rb') as f:
+        header = f.readline()
+        boundaries = [f.tell()]
+        while boundaries[-1] < file_size:
+            f.seek(min(boundaries[-1] + shard_size, file_size))
+            if f.tell() < file_size:
+                f.readline()  # Дочитываем до конца текущей строки
+            boundaries.append(f.tell())
+
+    shards = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return header, shards
+
+def _init_worker(model_path: str) -> None:
+    global _worker_model
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # Шарды крупные и всегда идут в XGBoost - калибровка и сверка компилированной модели не нужны
+    _worker_model = ModelLoader(model_path, crossover=0)
+    # Параллелизм даёт пул процессов, внутри воркера XGBoost работает в один поток
+    _worker_model.booster.set_param({"nthread": 1})
+
+def _score_shard(task: Tuple[int, str, bytes, int, int, str]) -> Tuple[int, int, str]:
+    """Парсит и скорит один шард, результат пишет в part-файл"""
+    shard_no, input_path, header, start, end, parts_dir = task
+    with open(input_path, 'rb') as f:
+        f.seek(start)
+        chunk = f.read(end - start)
+
+    feature_names = _worker_model.feature_names
+    usecols = needed_columns(pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist(), feature_names)
+    df = pd.read_csv(io.BytesIO(header + chunk), usecols=usecols, engine=CSV_ENGINE)
+    df, X = prepare_features(df, feature_names)
+    predictions = _worker_model.predictor.predict(X)
+    pred_df = build_prediction_frame(df, predictions)
+
+    part_path = Path(parts_dir) / PART_TEMPLATE.format(shard_no)
+    pred_df.to_csv(part_path, index=False)
+    return shard_no, len(pred_df), str(part_path)
+
+def concat_parts(part_paths: List[str], output_path: Path) -> None:
+    """Склеивает part-файлы по порядку, оставляя один заголовок"""
+    with open(output_path, 'wb') as out:
+        for i, part_path in enumerate(part_paths):
+            with open(part_path, 'rb') as part:
+                header = part.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(part, out, length=16 * 1024 * 1024)
+            os.remove(part_path)
+
+def score_file(
+    input_path: str,
+    output_path: str = None,
+    model_path: str = None,
+    workers: int = None,
+    shard_size_mb: int = DEFAULT_SHARD_SIZE_MB,
+    split: bool = False,
+) -> dict:
+    """
+    Скорит CSV файл шардами в нескольких процессах.
+
+    Args:
+        input_path: Входной CSV с признаками
+        output_path: Выходной CSV (или директория для part-файлов при split=True)
+        model_path: model.json или директория с ним
+        workers: Число процессов (по умолчанию - число ядер)
+        shard_size_mb: Размер шарда в мегабайтах
+        split: Не склеивать результат, оставить part-файлы
+
+    Returns:
+        dict со статистикой: rows, shards, seconds, rows_per_sec, output
+    """
+    input_path = Path(input_path)
+    if output_path is None:
+        output_path = Path(__file__).parent.parent / "data" / "fin_clients.csv"
+    output_path = Path(output_path)
+    model_path = model_path or settings.MODEL_PATH
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    header, shards = plan_shards(input_path, shard_size_mb * 1024 * 1024)
+
+    parts_dir = output_path if split else output_path.parent / f".{output_path.name}.parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Скоринг {input_path}: {len(shards)} шардов, {workers} процессов")
+
+    tasks = [
+        (shard_no, str(input_path), header, start, end, str(parts_dir))
+        for shard_no, (start, end) in enumerate(shards)
+    ]
+    total_rows = 0
+    part_paths = []
+
+    # imap сохраняет порядок шардов, поэтому порядок строк на выходе исходный
+    with mp.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(str(model_path),)) as pool:
+        for shard_no, rows, part_path in pool.imap(_score_shard, tasks):
+            total_rows += rows
+            part_paths.append(part_path)
+            elapsed = time.perf_counter() - started
+            logger.info(f"Шард {shard_no + 1}/{len(shards)}: {total_rows} строк, {total_rows / elapsed:,.0f} строк/с")
+
+    if not split:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        concat_parts(part_paths, output_path)
+        parts_dir.rmdir()
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "rows": total_rows,
+        "shards": len(shards),
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total_rows / elapsed) if elapsed > 0 else 0,
+        "output": str(output_path),
+    }
+    logger.info(f"✓ Обработано {total_rows} строк за {elapsed:.1f} с ({result['rows_per_sec']:,} строк/с)")
+    return result
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Офлайн-скоринг клиентов XGBoost моделью")
+    parser.add_argument("input", help="Входной CSV файл")
+    parser.add_argument("output", nargs="?", default=None, help="Выходной CSV (по умолчанию data/fin_clients.csv)")
+    parser.add_argument("--model", default=None, help="Путь к model.json или директории с ним")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов (по умолчанию - число ядер)")
+    parser.add_argument("--shard-size-mb", type=int, default=DEFAULT_SHARD_SIZE_MB, help="Размер шарда в МБ")
+    parser.add_argument("--split", action="store_true", help="Оставить результат part-файлами в директории output")
+    args = parser.parse_args(argv)
+
+    result = score_file(
+        args.input,
+        args.output,
+        model_path=args.model,
+        workers=args.workers,
+        shard_size_mb=args.shard_size_mb,
+        split=args.split,
+    )
+    print(f"Успешно обработано {result['rows']} записей за {result['seconds']} с ({result['rows_per_sec']} строк/с)")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -8,23 +8,67 @@ CSV формат:
 1. Читает fin_clients.csv (результат ML обработки)
 2. Парсит поля с валидацией
 3. INSERT в таблицу clients с обработкой дубликатов
+
+Быстрый режим (по умолчанию) читает файл один раз чанками, валидирует их
+векторно, отбракованные строки пишет в reject-файл, а остальные загружает
+через COPY ... FROM STDIN одной транзакцией. Загрузка после скоринга
+(load_clients_from_frame) принимает датафрейм напрямую, без CSV.
+
+Полная перезагрузка (replace) на PostgreSQL идёт через staging-таблицу
+(app.data.staging): живая clients подменяется только после заливки, так что
+читатели не видят пустую или частично загруженную таблицу.
 """
 
+import argparse
 import csv
+import io
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable, List, Optional
 
 # Добавляем путь к корню проекта
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import text, exc
+import pandas as pd
+from sqlalchemy import text, exc, delete, select, table, column
 from app.data.database import SessionLocal, engine
 from app.data.models import Client
+from app.services.credit_service import DECISION_COLUMNS, calculate_credit_decision, calculate_credit_decisions_frame
+from app.data.staging import create_staging_table, drop_staging_table, swap_staging_table
+from app.services.dashboard_service import refresh_dashboard_snapshot
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Колонки clients, заполняемые из CSV, и значения по умолчанию для числовых полей
+CLIENT_COLUMNS = ['id', 'target', 'incomeValue', 'avg_cur_cr_turn', 'ovrd_sum', 'loan_cur_amt', 'hdb_income_ratio', 'PDN']
+NUMERIC_DEFAULTS = {
+    'target': None,
+    'incomeValue': None,
+    'avg_cur_cr_turn': None,
+    'ovrd_sum': 0.0,
+    'loan_cur_amt': 0.0,
+    'hdb_income_ratio': None,
+    'PDN': None,
+}
+
+# Колонки, которые пишутся в clients: данные клиента, решение по кредиту и хеши для upsert
+LOADED_COLUMNS = CLIENT_COLUMNS + DECISION_COLUMNS + ['feature_hash', 'row_hash']
+
+# Строк в одном чанке чтения / COPY
+COPY_CHUNK_ROWS = 200000
+
+# Временная таблица для upsert-загрузки
+UPSERT_TABLE = "clients_upsert"
+
+# Размер пакета id при чтении сохранённых хешей признаков
+HASH_LOOKUP_BATCH = 10000
+
+# Сколько сообщений об ошибках возвращать в ответе (все строки - в reject-файле)
+MAX_ERRORS_IN_RESULT = 100
+
 def safe_float(value, default=0.0):
     """Безопасное преобразование в float"""
     if value is None or value == '':
@@ -40,12 +84,330 @@ def safe_str(value):
         return ""
     return str(value).strip()
 
-def load_clients_from_csv(csv_path: str = None) -> dict:
+def default_csv_path() -> Path:
+    # Ищем CSV в backend/data/fin_clients.csv (результат ML обработки)
+    return Path(__file__).parent.parent / "data" / "fin_clients.csv"
+
+def validate_clients_frame(df: pd.DataFrame, seen_ids: set) -> tuple:
+    """
+    Векторная валидация чанка - те же правила, что safe_str/safe_float.
+    
+    Отбраковываются строки с пустым id и повторы id (в т.ч. из прошлых чанков):
+    COPY не умеет пропускать конфликты, а первичный ключ их не допустит.
+    
+    Для валидных строк векторно считается решение по кредиту (DECISION_COLUMNS)
+    и row_hash - хеш содержимого, по которому upsert отличает изменённые
+    строки от неизменённых.
+    
+    Returns:
+        (валидные строки в порядке LOADED_COLUMNS, отбракованные строки с reject_reason)
+    """
+    if 'id' in df.columns:
+        ids = df['id'].astype('string').str.strip()
+    else:
+        ids = pd.Series(pd.NA, index=df.index, dtype='string')
+    empty = ids.isna() | (ids == '')
+    duplicate = ~empty & (ids.duplicated() | ids.isin(seen_ids))
+    
+    reason = pd.Series(None, index=df.index, dtype=object)
+    reason[duplicate] = "Повторяющийся ID клиента"
+    reason[empty] = "ID клиента не может быть пустым"
+    bad = empty | duplicate
+    
+    valid = pd.DataFrame({'id': ids[~bad].astype(object)})
+    for column, default in NUMERIC_DEFAULTS.items():
+        if column in df.columns:
+            values = pd.to_numeric(df.loc[~bad, column], errors='coerce')
+        else:
+            values = pd.Series(float('nan'), index=valid.index)
+        valid[column] = values.fillna(default) if default is not None else values
+    
+    valid[DECISION_COLUMNS] = calculate_credit_decisions_frame(valid)
+    valid['feature_hash'] = df.loc[~bad, 'feature_hash'] if 'feature_hash' in df.columns else None
+    row_hashes = pd.util.hash_pandas_object(valid[LOADED_COLUMNS[:-1]], index=False).to_numpy()
+    valid['row_hash'] = [f"{h:016x}" for h in row_hashes.tolist()]
+    
+    seen_ids.update(valid['id'])
+    rejects = df[bad].assign(reject_reason=reason[bad])
+    return valid[LOADED_COLUMNS], rejects
+
+def _copy_sql(table: str) -> str:
+    """COPY <table> (...) FROM STDIN с экранированными именами колонок"""
+    quote = engine.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(col) for col in LOADED_COLUMNS + ['created_at'])
+    return f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+def _write_chunk(conn, valid: pd.DataFrame, created_at: datetime, table_name: str = Client.__tablename__) -> None:
+    """Пишет чанк в clients (или её staging-копию): COPY для PostgreSQL, пакетный INSERT для остальных БД"""
+    valid = valid.assign(created_at=created_at)
+    if conn.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        valid.to_csv(buffer, index=False, header=False, na_rep='')
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(_copy_sql(table_name), buffer)
+    else:
+        records = valid.astype(object).where(valid.notna(), None).to_dict('records')
+        target = table(table_name, *(column(col, Client.__table__.c[col].type) for col in valid.columns))
+        conn.execute(target.insert(), records)
+
+def _create_upsert_table(conn) -> str:
+    """Временная таблица той же структуры, что clients, для пакетного upsert"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"CREATE TEMP TABLE {UPSERT_TABLE} (LIKE {Client.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    else:
+        conn.execute(text(f"DROP TABLE IF EXISTS temp.{UPSERT_TABLE}"))
+        conn.execute(text(f"CREATE TEMP TABLE {UPSERT_TABLE} AS SELECT * FROM {Client.__tablename__} WHERE 0"))
+    return UPSERT_TABLE
+
+def _apply_upsert(conn) -> tuple:
+    """
+    Переносит строки из временной таблицы в clients одним INSERT ... ON CONFLICT.
+    
+    Строки с тем же row_hash не обновляются (и не создают новых версий в heap).
+    
+    Returns:
+        (вставлено, обновлено)
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    clients = Client.__tablename__
+    columns = ", ".join(quote(col) for col in LOADED_COLUMNS + ['created_at'])
+    # created_at сохраняется от первой загрузки клиента
+    updates = ", ".join(f"{quote(col)} = excluded.{quote(col)}" for col in LOADED_COLUMNS if col != 'id')
+    
+    if conn.dialect.name == "postgresql":
+        # xmax = 0 у только что вставленных строк, у обновлённых - id транзакции
+        row = conn.execute(text(f"""
+            WITH upserted AS (
+                INSERT INTO {clients} ({columns})
+                SELECT {columns} FROM {UPSERT_TABLE}
+                ON CONFLICT (id) DO UPDATE SET {updates}
+                WHERE {clients}.row_hash IS DISTINCT FROM excluded.row_hash
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+        """)).one()
+        return int(row[0]), int(row[1])
+    
+    inserted = conn.execute(text(f"""
+        SELECT count(*) FROM {UPSERT_TABLE} s
+        WHERE NOT EXISTS (SELECT 1 FROM {clients} c WHERE c.id = s.id)
+    """)).scalar()
+    updated = conn.execute(text(f"""
+        SELECT count(*) FROM {UPSERT_TABLE} s JOIN {clients} c ON c.id = s.id
+        WHERE c.row_hash IS NOT s.row_hash
+    """)).scalar()
+    conn.execute(text(f"""
+        INSERT INTO {clients} ({columns})
+        SELECT {columns} FROM {UPSERT_TABLE} WHERE true
+        ON CONFLICT (id) DO UPDATE SET {updates}
+        WHERE {clients}.row_hash IS NOT excluded.row_hash
+    """))
+    conn.execute(text(f"DROP TABLE temp.{UPSERT_TABLE}"))
+    return int(inserted), int(updated)
+
+def fetch_feature_hashes(ids: Iterable[str]) -> pd.DataFrame:
+    """
+    Сохранённые feature_hash и предсказания для переданных id.
+    
+    Returns:
+        датафрейм с индексом id и колонками feature_hash, target
+    """
+    ids = list(ids)
+    frames = []
+    with engine.connect() as conn:
+        for start in range(0, len(ids), HASH_LOOKUP_BATCH):
+            batch = ids[start:start + HASH_LOOKUP_BATCH]
+            rows = conn.execute(
+                select(Client.id, Client.feature_hash, Client.target)
+                .where(Client.id.in_(batch), Client.feature_hash.is_not(None))
+            ).all()
+            frames.append(pd.DataFrame(rows, columns=['id', 'feature_hash', 'target']))
+    if not frames:
+        return pd.DataFrame(columns=['feature_hash', 'target'], index=pd.Index([], name='id'))
+    return pd.concat(frames, ignore_index=True).set_index('id')
+
+def _copy_chunks(
+    chunks: Iterable[pd.DataFrame],
+    replace: bool = False,
+    upsert: bool = False,
+    reject_path: Optional[Path] = None,
+    progress_callback: Callable[[int], None] = None,
+) -> dict:
+    """
+    Общий цикл быстрой загрузки: валидация и COPY чанков в одной транзакции.
+    
+    При replace на PostgreSQL чанки идут в staging-таблицу, которая после
+    заливки подменяет clients; на остальных БД старые строки удаляются в той же
+    транзакции. При upsert чанки идут во временную таблицу и переносятся в
+    clients одним INSERT ... ON CONFLICT, обновляя только изменённые строки.
+    Отбракованные строки пишутся в reject_path, если он задан.
+    """
+    if replace and upsert:
+        raise ValueError("replace и upsert взаимоисключающие")
+    if reject_path and reject_path.exists():
+        reject_path.unlink()
+    
+    total_rows = 0
+    loaded_count = 0
+    error_count = 0
+    errors_list: List[str] = []
+    seen_ids: set = set()
+    created_at = datetime.utcnow()
+    swap = replace and engine.dialect.name == "postgresql"
+    target_table = Client.__tablename__
+    inserted_count = updated_count = 0
+    
+    try:
+        with engine.begin() as conn:
+            if upsert:
+                target_table = _create_upsert_table(conn)
+            elif swap:
+                target_table = create_staging_table(conn, Client.__tablename__)
+            elif replace:
+                deleted_count = conn.execute(delete(Client)).rowcount
+                logger.info(f"Удалено существующих клиентов: {deleted_count}")
+            
+            for chunk in chunks:
+                valid, rejects = validate_clients_frame(chunk, seen_ids)
+                
+                if len(rejects):
+                    # Номер строки в файле: индекс + заголовок + нумерация с 1
+                    for row_num, reason in zip(rejects.index + 2, rejects['reject_reason']):
+                        if len(errors_list) < MAX_ERRORS_IN_RESULT:
+                            errors_list.append(f"Строка {row_num}: {reason}")
+                    if reject_path:
+                        rejects.to_csv(reject_path, mode='a', index=False, header=not reject_path.exists())
+                    error_count += len(rejects)
+                
+                if len(valid):
+                    _write_chunk(conn, valid, created_at, target_table)
+                
+                total_rows += len(chunk)
+                loaded_count += len(valid)
+                logger.debug(f"Загружено {loaded_count} клиентов...")
+                if progress_callback:
+                    progress_callback(loaded_count)
+            
+            if upsert:
+                inserted_count, updated_count = _apply_upsert(conn)
+        
+        if swap:
+            swap_staging_table(engine, Client.__tablename__)
+        
+        logger.info(f"✓ Загружено {loaded_count} клиентов из {total_rows} записей (COPY)")
+        if error_count > 0:
+            logger.warning(f"⚠ Отбраковано {error_count} записей" + (f", см. {reject_path}" if reject_path else ""))
+        
+        result = {
+            'total': total_rows,
+            'loaded': loaded_count,
+            'errors': error_count,
+            'errors_list': errors_list,
+            'reject_file': str(reject_path) if reject_path and error_count else None
+        }
+        if upsert:
+            result.update({
+                'inserted': inserted_count,
+                'updated': updated_count,
+                'unchanged': loaded_count - inserted_count - updated_count
+            })
+            logger.info(f"Upsert: вставлено {inserted_count}, обновлено {updated_count}, без изменений {result['unchanged']}")
+        return result
+    
+    except Exception as e:
+        # Транзакция откатывается целиком - в БД ничего не изменилось
+        logger.error(f"❌ Ошибка загрузки клиентов: {e}", exc_info=True)
+        if swap:
+            try:
+                drop_staging_table(engine, Client.__tablename__)
+            except Exception as drop_error:
+                logger.warning(f"Не удалось удалить staging-таблицу: {drop_error}")
+        return {
+            'total': total_rows,
+            'loaded': 0,
+            'errors': error_count + 1,
+            'errors_list': errors_list + [f"Общая ошибка: {str(e)}"],
+            'reject_file': str(reject_path) if reject_path and error_count else None
+        }
+
+def copy_clients_from_csv(
+    csv_path: str = None,
+    replace: bool = False,
+    upsert: bool = False,
+    reject_path: str = None,
+    progress_callback: Callable[[int], None] = None,
+) -> dict:
+    """
+    Быстрая загрузка клиентов: один проход по файлу, COPY, одна транзакция.
+    
+    Args:
+        csv_path: Путь к CSV файлу. Если None, ищет backend/data/fin_clients.csv
+        replace: Полностью заменить клиентов (на PostgreSQL - подменой staging-таблицы)
+        upsert: Вставить новых и обновить изменённых клиентов, остальных не трогать
+        reject_path: Куда писать отбракованные строки (по умолчанию <csv>.rejects.csv)
+        progress_callback: Вызывается с числом загруженных строк после каждого чанка
+    
+    Returns:
+        dict с результатами: total, loaded, errors, errors_list, reject_file
+        (+ inserted, updated, unchanged при upsert)
+    """
+    csv_path = Path(csv_path) if csv_path else default_csv_path()
+    if not csv_path.exists():
+        logger.error(f"CSV файл не найден: {csv_path}")
+        return {'total': 0, 'loaded': 0, 'errors': 0, 'errors_list': ['CSV файл не найден']}
+    
+    reject_path = Path(reject_path) if reject_path else csv_path.with_suffix('.rejects.csv')
+    chunks = pd.read_csv(csv_path, dtype={'id': str}, chunksize=COPY_CHUNK_ROWS)
+    return _copy_chunks(chunks, replace=replace, upsert=upsert, reject_path=reject_path, progress_callback=progress_callback)
+
+def load_clients_from_frame(
+    df: pd.DataFrame,
+    replace: bool = False,
+    upsert: bool = False,
+    reject_path: str = None,
+    progress_callback: Callable[[int], None] = None,
+) -> dict:
+    """
+    Загружает клиентов из уже посчитанного датафрейма (результат скоринга).
+    
+    Промежуточный CSV не пишется и не перечитывается: датафрейм режется на
+    чанки и уходит в COPY напрямую.
+    
+    Args:
+        df: Датафрейм с колонками CLIENT_COLUMNS (и, опционально, feature_hash)
+        replace: Полностью заменить клиентов (на PostgreSQL - подменой staging-таблицы)
+        upsert: Вставить новых и обновить изменённых клиентов, остальных не трогать
+        reject_path: Куда писать отбракованные строки (по умолчанию только в errors_list)
+        progress_callback: Вызывается с числом загруженных строк после каждого чанка
+    """
+    chunks = (df.iloc[start:start + COPY_CHUNK_ROWS] for start in range(0, len(df), COPY_CHUNK_ROWS))
+    return _copy_chunks(
+        chunks,
+        replace=replace,
+        upsert=upsert,
+        reject_path=Path(reject_path) if reject_path else None,
+        progress_callback=progress_callback
+    )
+
+def load_clients_from_csv(
+    csv_path: str = None,
+    progress_callback: Callable[[int], None] = None,
+    replace: bool = False,
+    fast: bool = True,
+    reject_path: str = None,
+    upsert: bool = False,
+) -> dict:
     """
     Загружает клиентов из CSV файла в БД.
     
     Args:
         csv_path: Путь к CSV файлу. Если None, ищет backend/data/fin_clients.csv
+        progress_callback: Вызывается с числом загруженных строк после каждого пакета
+        replace: Удалить существующих клиентов той же сессией перед загрузкой
+        fast: Загрузка через COPY (copy_clients_from_csv); False - построчно через ORM
+        reject_path: Файл для отбракованных строк (только при fast)
+        upsert: Обновить только изменённых клиентов (только при fast)
     
     Returns:
         dict с результатами: {
@@ -55,12 +417,18 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
             'errors_list': список ошибок
         }
     """
-    if csv_path is None:
-        # Ищем CSV в backend/data/fin_clients.csv (результат ML обработки)
-        script_dir = Path(__file__).parent
-        csv_path = script_dir.parent / "data" / "fin_clients.csv"
+    if upsert and not fast:
+        raise ValueError("upsert поддерживается только быстрой загрузкой (fast=True)")
+    if fast:
+        return copy_clients_from_csv(
+            csv_path,
+            replace=replace,
+            upsert=upsert,
+            reject_path=reject_path,
+            progress_callback=progress_callback
+        )
     
-    csv_path = Path(csv_path)
+    csv_path = Path(csv_path) if csv_path else default_csv_path()
     
     if not csv_path.exists():
         logger.error(f"CSV файл не найден: {csv_path}")
@@ -73,6 +441,10 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
     total_rows = 0
     
     try:
+        if replace:
+            deleted_count = db.query(Client).delete()
+            logger.info(f"Удалено существующих клиентов: {deleted_count}")
+        
         with open(csv_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             total_rows = sum(1 for _ in reader)  # Считаем общее количество строк
@@ -98,6 +470,19 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
                     hdb_income_ratio = safe_float(row.get('hdb_income_ratio'), None)
                     PDN = safe_float(row.get('PDN'), None)  # Новое поле
                     
+                    # Решение по кредиту хранится вместе с клиентом
+                    decision = {}
+                    if incomeValue and ovrd_sum is not None:
+                        debt_burden_ratio = (ovrd_sum / incomeValue) if incomeValue > 0 else 0.0
+                        decision = calculate_credit_decision({
+                            "debt_burden_ratio": debt_burden_ratio,
+                            "predicted_income": incomeValue or 0.0,
+                            "total_debt": ovrd_sum or 0.0,
+                            "loan_amount": loan_cur_amt or 0.0,
+                            "avg_cur_cr_turn": avg_cur_cr_turn or 0.0
+                        })
+                        decision["debt_burden_ratio"] = debt_burden_ratio
+                    
                     # Создаем клиента
                     client = Client(
                         id=client_id,
@@ -107,7 +492,8 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
                         ovrd_sum=ovrd_sum,
                         loan_cur_amt=loan_cur_amt,
                         hdb_income_ratio=hdb_income_ratio,
-                        PDN=PDN  # Новое поле
+                        PDN=PDN,  # Новое поле
+                        **decision
                     )
                     
                     batch.append(client)
@@ -119,6 +505,8 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
                         loaded_count += len(batch)
                         batch = []
                         logger.debug(f"Загружено {loaded_count} клиентов...")
+                        if progress_callback:
+                            progress_callback(loaded_count)
                     
                 except Exception as e:
                     error_count += 1
@@ -132,6 +520,8 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
                 db.bulk_save_objects(batch)
                 db.commit()
                 loaded_count += len(batch)
+                if progress_callback:
+                    progress_callback(loaded_count)
         
         logger.info(f"✓ Загружено {loaded_count} клиентов из {total_rows} записей")
         if error_count > 0:
@@ -159,8 +549,20 @@ def load_clients_from_csv(csv_path: str = None) -> dict:
 if __name__ == "__main__":
     # Запуск скрипта напрямую
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    result = load_clients_from_csv()
+    parser = argparse.ArgumentParser(description="Загрузка клиентов из CSV в БД")
+    parser.add_argument("csv_path", nargs="?", default=None, help="CSV файл (по умолчанию data/fin_clients.csv)")
+    parser.add_argument("--replace", action="store_true", help="Заменить всех существующих клиентов")
+    parser.add_argument("--upsert", action="store_true", help="Обновить только новых и изменённых клиентов")
+    parser.add_argument("--slow", action="store_true", help="Построчная загрузка через ORM вместо COPY")
+    parser.add_argument("--reject-file", default=None, help="Файл для отбракованных строк")
+    args = parser.parse_args()
+    if args.upsert and args.slow:
+        parser.error("--upsert нельзя совмещать с --slow")
+    
+    result = load_clients_from_csv(args.csv_path, replace=args.replace, fast=not args.slow, reject_path=args.reject_file, upsert=args.upsert)
     print(f"Результат загрузки: {result['loaded']} из {result['total']} записей")
+    if result['loaded'] > 0:
+        print(f"Поколение данных: {refresh_dashboard_snapshot()}")
     if result['errors'] > 0:
         print(f"Ошибки: {result['errors']}")
         for error in result['errors_list'][:5]:  # Показываем первые 5 ошибок
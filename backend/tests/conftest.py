@@ -0,0 +1,24 @@
+"""
+Общие фикстуры: тесты работают с временной SQLite-базой.
+
+DATABASE_URL задаётся до импорта приложения - движки создаются при импорте
+app.data.database.
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest
+
+from app.data.database import engine
+from app.data.models import Base
+
+@pytest.fixture
+def db_engine():
+    """Чистая схема на каждый тест"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
@@ -0,0 +1,157 @@
+import io
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select, text
+
+from app.data.models import Client
+from app.services.credit_service import calculate_credit_decision
+import scripts.load_clients as load_clients_module
+from scripts.load_clients import load_clients_from_csv, load_clients_from_frame
+
+CLIENTS_CSV = """id,target,incomeValue,avg_cur_cr_turn,ovrd_sum,loan_cur_amt,hdb_income_ratio,PDN
+1,100000,120000,50000,10000,200000,0.5,50
+2,80000,90000,20000,0,0,0.2,20
+3,300000,310000,150000,60000,500000,1.1,110
+"""
+
+def test_load_clients_slow_path(db_engine, tmp_path):
+    """Построчная загрузка через ORM (--slow) доходит до конца без ошибок"""
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text(CLIENTS_CSV, encoding="utf-8")
+
+    result = load_clients_from_csv(str(csv_path), fast=False, replace=True)
+
+    assert result["errors_list"] == []
+    assert result["loaded"] == 3
+    with db_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Client)).scalar() == 3
+
+def test_load_clients_slow_path_rejects_upsert(tmp_path):
+    """Upsert есть только у загрузки через COPY"""
+    with pytest.raises(ValueError):
+        load_clients_from_csv(str(tmp_path / "clients.csv"), fast=False, upsert=True)
+
+def test_load_clients_upsert(db_engine, tmp_path):
+    """Upsert вставляет новых клиентов, обновляет изменённых и не трогает остальных"""
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text(CLIENTS_CSV, encoding="utf-8")
+    load_clients_from_csv(str(csv_path), replace=True)
+
+    csv_path.write_text(
+        "id,target,incomeValue,avg_cur_cr_turn,ovrd_sum,loan_cur_amt,hdb_income_ratio,PDN\n"
+        "1,100000,120000,50000,10000,200000,0.5,50\n"
+        "2,85000,90000,20000,0,0,0.2,20\n"
+        "4,50000,60000,10000,0,0,0.1,10\n",
+        encoding="utf-8"
+    )
+    result = load_clients_from_csv(str(csv_path), upsert=True)
+
+    assert result["errors_list"] == []
+    assert (result["inserted"], result["updated"], result["unchanged"]) == (1, 1, 1)
+    with db_engine.connect() as conn:
+        rows = dict(conn.execute(select(Client.id, Client.target).order_by(Client.id)).all())
+    assert rows == {"1": 100000, "2": 85000, "3": 300000, "4": 50000}
+
+def test_load_clients_replace(db_engine, tmp_path):
+    """Полная перезагрузка оставляет в clients ровно строки нового файла"""
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text(CLIENTS_CSV, encoding="utf-8")
+    load_clients_from_csv(str(csv_path), replace=True)
+
+    csv_path.write_text(
+        "id,target,incomeValue,avg_cur_cr_turn,ovrd_sum,loan_cur_amt,hdb_income_ratio,PDN\n"
+        "3,310000,310000,150000,60000,500000,1.1,110\n"
+        "5,70000,75000,30000,0,0,0.3,30\n",
+        encoding="utf-8"
+    )
+    result = load_clients_from_csv(str(csv_path), replace=True)
+
+    assert result["errors_list"] == []
+    assert result["loaded"] == 2
+    with db_engine.connect() as conn:
+        rows = dict(conn.execute(select(Client.id, Client.target).order_by(Client.id)).all())
+    assert rows == {"3": 310000, "5": 70000}
+
+def test_load_clients_replace_swaps_staging_table(db_engine, tmp_path, monkeypatch):
+    """На PostgreSQL replace заливает staging-таблицу и подменяет ею clients"""
+    swapped = []
+
+    def create_staging_table(conn, table):
+        conn.execute(text(f"CREATE TABLE {table}_staging AS SELECT * FROM {table} WHERE 0"))
+        return f"{table}_staging"
+
+    def swap_staging_table(engine, table):
+        swapped.append(table)
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {table}"))
+            conn.execute(text(f"ALTER TABLE {table}_staging RENAME TO {table}"))
+
+    # Выбор staging-пути смотрит на диалект движка; запись идёт через реальное SQLite-соединение
+    fake_engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), begin=db_engine.begin)
+    monkeypatch.setattr(load_clients_module, "engine", fake_engine)
+    monkeypatch.setattr(load_clients_module, "create_staging_table", create_staging_table)
+    monkeypatch.setattr(load_clients_module, "swap_staging_table", swap_staging_table)
+
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text(CLIENTS_CSV, encoding="utf-8")
+    result = load_clients_from_csv(str(csv_path), replace=True)
+
+    assert result["errors_list"] == []
+    assert swapped == ["clients"]
+    with db_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM clients")).scalar() == 3
+
+def test_load_clients_fast_path_writes_rejects(db_engine, tmp_path):
+    """COPY-загрузка пропускает пустые и повторные id и пишет их в reject-файл"""
+    csv_path = tmp_path / "clients.csv"
+    csv_path.write_text(
+        CLIENTS_CSV
+        + ",50000,60000,10000,0,0,0.1,10\n"
+        + "2,1,1,1,0,0,0.1,1\n",
+        encoding="utf-8"
+    )
+    reject_path = tmp_path / "rejects.csv"
+
+    result = load_clients_from_csv(str(csv_path), replace=True, reject_path=str(reject_path))
+
+    assert (result["total"], result["loaded"], result["errors"]) == (5, 3, 2)
+    assert result["errors_list"] == [
+        "Строка 5: ID клиента не может быть пустым",
+        "Строка 6: Повторяющийся ID клиента",
+    ]
+    assert result["reject_file"] == str(reject_path)
+    rejects = pd.read_csv(reject_path, dtype={"id": str})
+    assert rejects["reject_reason"].tolist() == ["ID клиента не может быть пустым", "Повторяющийся ID клиента"]
+    with db_engine.connect() as conn:
+        rows = dict(conn.execute(select(Client.id, Client.target).order_by(Client.id)).all())
+    assert rows == {"1": 100000, "2": 80000, "3": 300000}
+
+def test_load_clients_stores_credit_decision(db_engine):
+    """Решение по кредиту считается при загрузке и совпадает с calculate_credit_decision"""
+    df = pd.read_csv(io.StringIO(CLIENTS_CSV), dtype={"id": str})
+    df.loc[len(df)] = ["4", 10000, None, None, 0, 0, None, None]
+
+    result = load_clients_from_frame(df, replace=True)
+
+    assert result["loaded"] == 4
+    with db_engine.connect() as conn:
+        clients = {client.id: client for client in conn.execute(select(Client)).all()}
+    for row in df.itertuples():
+        client = clients[row.id]
+        if pd.isna(row.incomeValue):
+            assert (client.risk_level, client.recommendation, client.credit_eligible) == (None, None, None)
+            continue
+        expected = calculate_credit_decision({
+            "debt_burden_ratio": row.ovrd_sum / row.incomeValue,
+            "predicted_income": row.incomeValue,
+            "total_debt": row.ovrd_sum,
+            "loan_amount": row.loan_cur_amt,
+            "avg_cur_cr_turn": row.avg_cur_cr_turn,
+        })
+        assert client.debt_burden_ratio == pytest.approx(row.ovrd_sum / row.incomeValue)
+        assert client.risk_level == expected["risk_level"]
+        assert client.recommendation == expected["recommendation"]
+        assert client.credit_eligible == expected["credit_eligible"]
+        assert client.reasoning == expected["reasoning"]
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from app.ml.predictor import CompiledForest, Predictor
+from app.ml.preprocessor import read_scoring_csv
+
+SCORING_CSV = """id,incomeValue,feature_a,feature_b,raw_1,raw_2,raw_3
+1,120000,0.1,1.0,a,b,c
+2,90000,0.2,2.0,a,b,c
+"""
+
+def test_read_scoring_csv_estimates_saving_without_reparse(tmp_path):
+    """Экономия оценивается по доле пропущенных колонок, без пропуска - ноль"""
+    csv_path = tmp_path / "input.csv"
+    csv_path.write_text(SCORING_CSV, encoding="utf-8")
+
+    df, stats = read_scoring_csv(csv_path, ["feature_a", "feature_b"])
+    assert list(df.columns) == ["id", "incomeValue", "feature_a", "feature_b"]
+    assert (stats["columns_total"], stats["columns_parsed"]) == (7, 4)
+    assert stats["estimated_seconds_saved"] == pytest.approx(stats["parse_seconds"] * 0.75, abs=1e-3)
+
+    _, stats = read_scoring_csv(csv_path, None)
+    assert stats["estimated_seconds_saved"] == 0.0
+
+def _train_booster(objective: str, seed: int = 0) -> xgb.Booster:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(500, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = np.nan_to_num(X[:, 0]) * 2 + np.nan_to_num(X[:, 1]) ** 2 + rng.normal(0, 0.1, 500)
+    if objective == "binary:logistic":
+        y = (y > np.median(y)).astype(float)
+    params = {"objective": objective, "max_depth": 4, "eta": 0.3, "seed": seed}
+    return xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=20)
+
+@pytest.mark.parametrize("objective", ["reg:squarederror", "binary:logistic"])
+def test_compiled_forest_matches_xgboost(objective):
+    """Компилированный лес даёт те же предсказания, что booster.predict, включая NaN"""
+    booster = _train_booster(objective)
+    forest = CompiledForest.from_json(booster.save_raw("json"))
+
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = np.nan
+
+    expected = booster.predict(xgb.DMatrix(X))
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=1e-6, atol=1e-6)
+
+def test_predictor_with_explicit_crossover_disables_mismatched_forest():
+    """Явный crossover не отключает сверку: расходящийся лес не используется"""
+    booster = _train_booster("reg:squarederror")
+    forest = CompiledForest.from_json(booster.save_raw("json"))
+    assert Predictor(booster, forest, crossover=64).forest is forest
+
+    forest.value = forest.value + np.float32(1.0)
+    predictor = Predictor(booster, forest, crossover=64)
+    assert predictor.forest is None
+    assert predictor.crossover == 0
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from app.services.credit_service import (
+    RECOMMENDATIONS, REASONINGS, RISK_LEVELS,
+    calculate_credit_decision, calculate_credit_decisions_batch,
+)
+from app.services.export_service import ndjson_chunks
+
+async def _partitions(*batches):
+    for rows in batches:
+        yield rows
+
+def _collect(chunks) -> bytes:
+    async def collect():
+        return b"".join([chunk async for chunk in chunks])
+    return asyncio.run(collect())
+
+def test_ndjson_chunks_serializes_datetime():
+    """Колонка DateTime (created_at) выгружается в NDJSON строкой ISO 8601"""
+    created_at = datetime(2026, 10, 19, 12, 30, 15)
+    body = _collect(ndjson_chunks(
+        ("id", "incomeValue", "created_at"),
+        _partitions([("1", 120000.5, created_at)], [("2", None, created_at)])
+    ))
+
+    lines = body.splitlines()
+    assert [orjson.loads(line) for line in lines] == [
+        {"id": "1", "incomeValue": 120000.5, "created_at": "2026-10-19T12:30:15"},
+        {"id": "2", "incomeValue": None, "created_at": "2026-10-19T12:30:15"},
+    ]
+
+
+def _fuzzed_clients(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Случайные клиенты с NaN, нулями, отрицательным доходом и значениями на границах правил"""
+    rng = np.random.default_rng(seed)
+    income = rng.choice([0.0, -50000.0, 100000.0, 150000.0, 149999.0, np.nan], n_rows)
+    income = np.where(rng.random(n_rows) < 0.5, rng.uniform(1, 400000, n_rows), income)
+    # Доли дохода на порогах 0.3 / 0.6 / 0.8 / 2 и между ними
+    share = rng.choice([0.0, 0.1, 0.29, 0.3, 0.45, 0.6, 0.7, 0.8, 0.81, 2.0, 2.5], (3, n_rows))
+    frame = pd.DataFrame({
+        'incomeValue': income,
+        'ovrd_sum': income * share[0],
+        'loan_cur_amt': income * share[1],
+        'avg_cur_cr_turn': income * share[2],
+    })
+    for column in ('ovrd_sum', 'loan_cur_amt', 'avg_cur_cr_turn'):
+        frame.loc[rng.random(n_rows) < 0.1, column] = np.nan
+    return frame
+
+def test_credit_decisions_batch_matches_scalar():
+    """Векторный расчёт совпадает с calculate_credit_decision построчно"""
+    frame = _fuzzed_clients(5000)
+    batch = calculate_credit_decisions_batch(frame)
+
+    for i, row in enumerate(frame.itertuples()):
+        # Те же правила подготовки входа, что при построчной загрузке
+        income, ovrd = row.incomeValue, row.ovrd_sum
+        if np.isnan(income) or income == 0 or np.isnan(ovrd):
+            assert not batch['has_decision'][i]
+            continue
+        assert batch['has_decision'][i]
+        debt_burden_ratio = ovrd / income if income > 0 else 0.0
+        expected = calculate_credit_decision({
+            "debt_burden_ratio": debt_burden_ratio,
+            "predicted_income": income,
+            "total_debt": ovrd,
+            "loan_amount": 0.0 if np.isnan(row.loan_cur_amt) else row.loan_cur_amt,
+            "avg_cur_cr_turn": 0.0 if np.isnan(row.avg_cur_cr_turn) else row.avg_cur_cr_turn,
+        })
+        actual = {
+            "credit_eligible": bool(batch['credit_eligible'][i]),
+            "risk_level": RISK_LEVELS[batch['risk_level'][i]],
+            "recommendation": RECOMMENDATIONS[batch['recommendation'][i]],
+            "reasoning": REASONINGS[batch['reasoning'][i]],
+        }
+        assert actual == expected, f"строка {i}: {row}"
+        assert batch['debt_burden_ratio'][i] == debt_burden_ratio
@@ -8,29 +8,51 @@ export default function ClientListPage() {
   const [sortBy, setSortBy] = useState('incomeValue');
   const [order, setOrder] = useState('desc');
   const [riskFilter, setRiskFilter] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchClients();
   }, [sortBy, order, riskFilter]);
 
+  const requestPage = async (cursor) => {
+    const token = localStorage.getItem('token');
+    let url = `${import.meta.env.VITE_API_URL}/clients?sort=${sortBy}&order=${order}&limit=50`;
+    
+    if (riskFilter) url += `&risk_level=${riskFilter}`;
+    if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+    
+    const response = await axios.get(url, {
+      headers: { Authorization: `Bearer ${token}` }
+    });
+    return response.data;
+  };
+
   const fetchClients = async () => {
     setLoading(true);
     try {
-      const token = localStorage.getItem('token');
-      let url = `${import.meta.env.VITE_API_URL}/clients?sort=${sortBy}&order=${order}&limit=50`;
-      
-      if (riskFilter) url += `&risk_level=${riskFilter}`;
-      
-      const response = await axios.get(url, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setClients(response.data.items);
+      const data = await requestPage(null);
+      setClients(data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       alert('Ошибка загрузки клиентов');
     }
     setLoading(false);
   };
 
+  // Следующая страница продолжается с курсора предыдущей
+  const fetchMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await requestPage(nextCursor);
+      setClients((prev) => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      alert('Ошибка загрузки клиентов');
+    }
+    setLoadingMore(false);
+  };
+
   if (loading) return <div>Загрузка...</div>;
 
   return (
@@ -125,6 +147,12 @@ export default function ClientListPage() {
         </tbody>
       </table>
 
+      {nextCursor && (
+        <button className="load-more-button" onClick={fetchMore} disabled={loadingMore}>
+          {loadingMore ? 'Загрузка...' : 'Показать ещё'}
+        </button>
+      )}
+
       {clients.length === 0 && (
         <div className="empty-state">
           <p>Нет данных о клиентах</p>
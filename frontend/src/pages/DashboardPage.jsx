@@ -28,6 +28,25 @@ export default function DashboardPage() {
     setLoading(false);
   };
 
+  const waitForUploadJob = async (jobId, token) => {
+    while (true) {
+      const response = await axios.get(
+        `${import.meta.env.VITE_API_URL}/clients/upload-jobs/${jobId}`,
+        {
+          headers: { Authorization: `Bearer ${token}` }
+        }
+      );
+      const job = response.data;
+      if (job.status === 'completed' || job.status === 'failed') {
+        return job;
+      }
+
+      const progress = job.rows_total ? ` ${job.rows_done}/${job.rows_total}` : '';
+      setUploadMessage(`Обработка: ${job.stage}${progress}`);
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  };
+
   const handleFileUpload = async (event) => {
     const file = event.target.files[0];
     if (!file) return;
@@ -56,7 +75,13 @@ export default function DashboardPage() {
         }
       );
 
-      setUploadMessage(`Успешно загружено ${response.data.processed_clients} клиентов`);
+      // Обработка идет в фоне - опрашиваем статус задачи
+      const job = await waitForUploadJob(response.data.job_id, token);
+      if (job.status === 'failed') {
+        throw { response: { data: { detail: job.errors[job.errors.length - 1] } } };
+      }
+
+      setUploadMessage(`Успешно загружено ${job.result.processed_clients} клиентов`);
       
       // Обновляем dashboard после загрузки
       await fetchDashboard();